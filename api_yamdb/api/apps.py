@@ -1,5 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+def check_shared_cache():
+    """Сброс записей в кеше процесса не виден другим процессам gunicorn."""
+    if settings.DEBUG:
+        return
+    for alias in {settings.SHARED_CACHE_ALIAS, settings.AUTH_USER_CACHE_ALIAS}:
+        if isinstance(caches[alias], LocMemCache):
+            raise ImproperlyConfigured(
+                f'Кеш {alias} должен быть общим для процессов, '
+                f'а не LocMemCache'
+            )
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        check_shared_cache()
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.replicas import pin_pinned_user
+
+USER_KEY = 'auth:user:{}'
+# Поля, которые нужны для проверки прав, остальные загружаются по запросу
+USER_FIELDS = (
+    'id', 'username', 'role', 'is_staff', 'is_superuser', 'is_active'
+)
+
+
+def get_user_fields(user_model):
+    # from_db ждет значения в порядке полей модели
+    return [
+        field.attname
+        for field in user_model._meta.concrete_fields
+        if field.attname in USER_FIELDS
+    ]
+
+
+def get_user_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def invalidate_user(sender, instance, **kwargs):
+    get_user_cache().delete(USER_KEY.format(instance.pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса к таблице пользователей.
+
+    Поля из USER_FIELDS кешируются на AUTH_USER_CACHE_TIMEOUT секунд,
+    request.user собирается из них как объект с отложенными полями:
+    остальные поля читаются из БД только при обращении к ним.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        # Вызывается до чтения данных запроса
+        pin_pinned_user(user_id)
+        user_model = get_user_model()
+        field_names = get_user_fields(user_model)
+        cache = get_user_cache()
+        key = USER_KEY.format(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*field_names).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+        user = user_model.from_db(
+            router.db_for_read(user_model), field_names, values
+        )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,126 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from api_yamdb.metrics import measure_serialize
+from api_yamdb.replicas import pin_to_primary
+
+from .conditional import get_not_modified_response, set_validator_headers
+from .versions import get_versions, is_recently_bumped
+
+RESPONSE_KEY = 'api:response:{}'
+FRAGMENT_KEY = 'api:fragment:{}:{}:{}'
+
+
+def get_api_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def response_cache_key(request, versions):
+    url = request.build_absolute_uri()
+    versions = ':'.join(str(version) for version in versions)
+    return RESPONSE_KEY.format(
+        md5(
+            f'{url}|{request.accepted_media_type}|{versions}'.encode()
+        ).hexdigest()
+    )
+
+
+def fragment_key(model, obj):
+    """Ключ представления объекта: id и дата его последнего изменения."""
+    return FRAGMENT_KEY.format(
+        model._meta.label_lower, obj.id, obj.updated.timestamp()
+    )
+
+
+def get_fragments(model, objects, render):
+    """Представления объектов из кеша фрагментов.
+
+    objects - объекты модели или строки values_list() с полями id и
+    updated. render(objects) сериализует только промахи кеша, их
+    представления сохраняются. Дата изменения обновляется при любом
+    изменении, входящем в представление (reviews.signals), поэтому
+    устаревший фрагмент не будет найден по новому ключу.
+    """
+    cache = caches[settings.FRAGMENT_CACHE_ALIAS]
+    keys = [fragment_key(model, obj) for obj in objects]
+    fragments = cache.get_many(keys)
+    missing = [
+        (key, obj) for key, obj in zip(keys, objects) if key not in fragments
+    ]
+    if missing:
+        rendered = dict(zip(
+            (key for key, _ in missing),
+            render([obj for _, obj in missing]),
+        ))
+        cache.set_many(rendered)
+        fragments.update(rendered)
+    return [fragments[key] for key in keys]
+
+
+class CachedResponseMixin:
+    """Кеширование ответов на чтение для анонимных пользователей.
+
+    Ключ строится из адреса запроса и версий моделей из cache_models,
+    версии меняются при любом изменении этих моделей (api.signals).
+    Вскоре после смены версии промах кеша читает из основной базы, чтобы
+    под новой версией не сохранился ответ из отстающей реплики.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        # Ответы авторизованным пользователям не кешируем совсем,
+        # чтобы они не попали к другим пользователям
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        cache = get_api_cache()
+        versions = get_versions(self.cache_models)
+        key = response_cache_key(request, versions)
+        cached = cache.get(key)
+        if cached is not None:
+            data, validators = cached
+            if validators is None:
+                return Response(data, headers={'X-Cache': 'HIT'})
+            not_modified = get_not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+            return set_validator_headers(
+                Response(data, headers={'X-Cache': 'HIT'}), validators
+            )
+        if is_recently_bumped(versions):
+            pin_to_primary()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key, (response.data, getattr(response, 'validators', None))
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class FragmentCacheMixin:
+    """Представление объекта из кеша фрагментов, общего со списком.
+
+    Ответ с параметром fields собирается без кеша.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'fields' in self.get_serializer_context():
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        with measure_serialize(request):
+            data, = get_fragments(
+                self.get_serializer_class().Meta.model,
+                [instance],
+                lambda objects: [
+                    self.get_serializer(obj).data for obj in objects
+                ],
+            )
+        return Response(data)
@@ -0,0 +1,117 @@
+from hashlib import md5
+
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from .versions import get_bumped_at, get_versions
+
+
+def get_validators(request, queryset, field='updated'):
+    """ETag и Last-Modified по дате последнего изменения и числу записей.
+
+    Стоит одного запроса с агрегатами, тело ответа не сериализуется.
+    """
+    state = queryset.order_by().aggregate(
+        last_modified=Max(field), count=Count('pk')
+    )
+    last_modified = state['last_modified']
+    etag = md5(
+        f'{request.get_full_path()}|{request.accepted_media_type}|'
+        f'{last_modified and last_modified.isoformat()}|{state["count"]}'
+        .encode()
+    ).hexdigest()
+    return {
+        'etag': f'W/{quote_etag(etag)}',
+        'last_modified': last_modified and int(last_modified.timestamp()),
+    }
+
+
+def get_version_validators(request, versions):
+    """ETag и Last-Modified списка по версиям данных его моделей.
+
+    Версии меняются при любом изменении, включая удаление, и читаются из
+    кеша без запросов к БД. Last-Modified - время последней смены версии,
+    если оно известно для всех моделей.
+    """
+    etag = md5(
+        f'{request.get_full_path()}|{request.accepted_media_type}|'
+        f'{":".join(versions)}'.encode()
+    ).hexdigest()
+    bumped_at = [get_bumped_at(version) for version in versions]
+    return {
+        'etag': f'W/{quote_etag(etag)}',
+        'last_modified': (
+            int(max(bumped_at)) if bumped_at and all(bumped_at) else None
+        ),
+    }
+
+
+def set_validator_headers(response, validators):
+    response['ETag'] = validators['etag']
+    if validators['last_modified'] is not None:
+        response['Last-Modified'] = http_date(validators['last_modified'])
+    return response
+
+
+def get_not_modified_response(request, validators):
+    """Ответ 304, если у клиента актуальная версия, иначе None."""
+    response = set_validator_headers(HttpResponse(), validators)
+    conditional = get_conditional_response(
+        request,
+        etag=validators['etag'],
+        last_modified=validators['last_modified'],
+        response=response,
+    )
+    if conditional is response:
+        return None
+    return conditional
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы: заголовки ETag и Last-Modified и ответ 304.
+
+    Валидаторы списка строятся по версиям моделей validator_models, а
+    объекта - одним агрегатным запросом по get_validator_queryset(), до
+    выборки и сериализации данных. Список без validator_models должен
+    переопределить get_validator_queryset(): дата изменения его строк не
+    меняется при удалении строки.
+    """
+
+    validator_models = ()
+
+    def get_validator_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def get_conditional_validators(self, request):
+        if self.action == 'list' and self.validator_models:
+            return get_version_validators(
+                request, get_versions(self.validator_models)
+            )
+        return get_validators(request, self.get_validator_queryset())
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        validators = self.get_conditional_validators(request)
+        not_modified = get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_validator_headers(response, validators)
+            response.validators = validators
+        return response
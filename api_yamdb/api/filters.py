@@ -1,5 +1,7 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class CharFilterInFilter(filters.BaseInFilter, filters.CharFilter):
@@ -13,7 +15,20 @@ class TitleFilter(filters.FilterSet):
     )
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
     year = filters.NumberFilter(field_name='year')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['genre', 'category', 'year', 'name']
+        fields = ['genre', 'category', 'year', 'name', 'search']
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """При поиске по умолчанию сортирует по релевантности"""
+
+    def get_default_ordering(self, view):
+        if view.request.query_params.get('search'):
+            return ('-search_rank', 'name')
+        return super().get_default_ordering(view)
@@ -0,0 +1,60 @@
+import gzip
+import timeit
+
+from api.renderers import ORJSONRenderer
+from django.core.management.base import BaseCommand
+
+from .benchmark_renderers import build_page
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVELS = (1, 3, 4, 5, 6, 9)
+BROTLI_QUALITIES = (1, 2, 3, 4, 5, 11)
+
+
+class Command(BaseCommand):
+    help = 'Размер и время сжатия страницы /api/v1/titles/ gzip и brotli'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100)
+        parser.add_argument(
+            '--description-size',
+            type=int,
+            default=20,
+            help='Длина описания произведения в предложениях',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        content = ORJSONRenderer().render(
+            build_page(options['items'], options['description_size'])
+        )
+        methods = [
+            (f'gzip {level}', lambda data, level=level: gzip.compress(
+                data, compresslevel=level, mtime=0
+            ))
+            for level in GZIP_LEVELS
+        ]
+        if brotli is not None:
+            methods += [
+                (f'brotli {quality}', lambda data, quality=quality: (
+                    brotli.compress(data, quality=quality)
+                ))
+                for quality in BROTLI_QUALITIES
+            ]
+        repeat = options['repeat']
+        self.stdout.write(f'{"identity":<10} {len(content):>8} bytes')
+        for name, compress in methods:
+            size = len(compress(content))
+            seconds = min(timeit.repeat(
+                lambda: compress(content), number=repeat, repeat=3
+            )) / repeat
+            self.stdout.write(
+                f'{name:<10} {size:>8} bytes '
+                f'{100 * (1 - size / len(content)):>5.1f}% saved '
+                f'{seconds * 1000:>8.2f} ms '
+                f'{len(content) / seconds / 2 ** 20:>7.1f} MB/s'
+            )
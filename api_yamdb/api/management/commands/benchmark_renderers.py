@@ -0,0 +1,93 @@
+import random
+import timeit
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from api.serializers import TitleListSerializer
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Genre, Title
+
+GENRES_PER_TITLE = 3
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'на', 'сто', 'ве', 'ло', 'при', 'до', 'ра', 'те',
+    'ль', 'но', 'зо', 'ги', 'ва', 'ску', 'пре', 'ен', 'ат', 'ол', 'ий',
+)
+
+
+def make_text(seed, sentences):
+    """Текст из псевдослучайных слов: сжимается как обычный текст."""
+    generator = random.Random(seed)
+    return ' '.join(
+        ' '.join(
+            ''.join(
+                generator.choice(SYLLABLES)
+                for _ in range(generator.randint(1, 4))
+            )
+            for _ in range(generator.randint(5, 12))
+        ).capitalize() + '.'
+        for _ in range(sentences)
+    )
+
+
+def build_page(items, description_size=10):
+    """Страница списка произведений, как ее отдает /api/v1/titles/.
+
+    description_size - длина описания в предложениях.
+    """
+    categories = [
+        Category(id=index, name=f'Категория {index}', slug=f'category-{index}')
+        for index in range(1, 6)
+    ]
+    genres = [
+        Genre(id=index, name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(1, 11)
+    ]
+    titles = []
+    for index in range(1, items + 1):
+        title = Title(
+            id=index,
+            name=f'Произведение {index}',
+            year=1950 + index % 70,
+            description=make_text(index, description_size),
+            category=categories[index % len(categories)],
+        )
+        title.rating = index % 10 + 1 if index % 4 else None
+        title._prefetched_objects_cache = {'genre': [
+            genres[(index + shift) % len(genres)]
+            for shift in range(GENRES_PER_TITLE)
+        ]}
+        titles.append(title)
+    return {
+        'count': items,
+        'next': 'http://testserver/api/v1/titles/?limit=100&offset=100',
+        'previous': None,
+        'results': TitleListSerializer(titles, many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Сравнение скорости JSONRenderer DRF, orjson и MessagePack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        data = build_page(options['items'])
+        repeat = options['repeat']
+        renderers = [('DRF JSONRenderer', JSONRenderer())]
+        renderers.append(('ORJSONRenderer', ORJSONRenderer()))
+        if MessagePackRenderer.available:
+            renderers.append(('MessagePackRenderer', MessagePackRenderer()))
+        baseline = None
+        for name, renderer in renderers:
+            size = len(renderer.render(data))
+            seconds = min(timeit.repeat(
+                lambda: renderer.render(data), number=repeat, repeat=3
+            )) / repeat
+            baseline = baseline or seconds
+            self.stdout.write(
+                f'{name:<20} {1 / seconds:>10.0f} ops/s '
+                f'{seconds * 1e6:>9.1f} us {size:>8} bytes '
+                f'x{baseline / seconds:.1f}'
+            )
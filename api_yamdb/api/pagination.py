@@ -0,0 +1,127 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       LimitOffsetPagination)
+
+
+class KeysetPagination(CursorPagination):
+    """Постраничный вывод по ключу (pub_date, id) от новых к старым.
+
+    Курсор хранит дату публикации и id крайней записи страницы, поэтому
+    выборка любой страницы - это WHERE по индексу и LIMIT без OFFSET и
+    без COUNT(*).
+    """
+
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = None if self.cursor is None else self.cursor.position
+
+        queryset = queryset.order_by(
+            *(('pub_date', 'id') if reverse else self.ordering)
+        )
+        if position is not None:
+            queryset = self.filter_position(queryset, position, reverse)
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def filter_position(self, queryset, position, reverse=False):
+        """Записи после позиции курсора в порядке выдачи."""
+        pub_date, pk = position
+        lookup = 'gt' if reverse else 'lt'
+        # Условие на pub_date вне OR дает диапазон по индексу
+        # (title_id, pub_date), OR уточняет только границу
+        return queryset.filter(
+            Q(**{f'pub_date__{lookup}': pub_date})
+            | Q(pub_date=pub_date, **{f'id__{lookup}': pk}),
+            **{f'pub_date__{lookup}e': pub_date},
+        )
+
+    def decode_cursor(self, request):
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+        cursor = super().decode_cursor(request)
+        try:
+            pub_date, pk = cursor.position.split('|')
+            position = (parse_datetime(pub_date), int(pk))
+        except (AttributeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _get_position_from_instance(self, instance, ordering=None):
+        # instance - объект модели или строка values_list(named=True)
+        return self._encode_position(instance.pub_date, instance.id)
+
+    def _encode_position(self, pub_date, pk):
+        return f'{pub_date.isoformat()}|{pk}'
+
+    def _get_link(self, reverse, instance):
+        if instance is None:
+            # Пустая страница: граница остается там же, где курсор
+            position = self._encode_position(*self.cursor.position)
+        else:
+            position = self._get_position_from_instance(instance)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=reverse, position=position)
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._get_link(False, self.page[-1] if self.page else None)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._get_link(True, self.page[0] if self.page else None)
+
+
+class ReviewCommentPagination(LimitOffsetPagination):
+    """Лимит/смещение по умолчанию и постраничный вывод по ключу,
+    если в запросе передан параметр cursor (пустой - первая страница).
+    """
+
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_fields(self, view):
+        return super().get_schema_fields(view) + [
+            field
+            for field in self.keyset_class().get_schema_fields(view)
+            if field.name == self.keyset_class.cursor_query_param
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            parameter
+            for parameter in (
+                self.keyset_class().get_schema_operation_parameters(view)
+            )
+            if parameter['name'] == self.keyset_class.cursor_query_param
+        ]
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from reviews.models import ConfirmationCode
+
+from .utils import make_pin
+
+KEY_PREFIX = 'pincode'
+
+
+def _digest(user, pincode):
+    return salted_hmac(KEY_PREFIX, f'{user.pk}:{pincode}').hexdigest()
+
+
+class CachePincodeStore:
+    """Коды в кеше: истекают сами, попытки считаются через incr."""
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def get_keys(self, user):
+        key = f'{KEY_PREFIX}:{user.pk}'
+        return key, f'{key}:attempts', f'{key}:used'
+
+    def issue(self, user, digest):
+        code_key, attempts_key, used_key = self.get_keys(user)
+        self.cache.set_many(
+            {code_key: digest, attempts_key: 0}, settings.PINCODE_TTL
+        )
+        self.cache.delete(used_key)
+
+    def check(self, user, digest):
+        """True или False, None - кода в кеше нет."""
+        code_key, attempts_key, used_key = self.get_keys(user)
+        stored = self.cache.get(code_key)
+        if stored is None:
+            return None
+        if constant_time_compare(stored, digest):
+            # Между get и delete код может прочитать параллельный запрос,
+            # погашает его только тот, чей add прошел первым
+            if not self.cache.add(used_key, True, settings.PINCODE_TTL):
+                return False
+            self.cache.delete_many((code_key, attempts_key))
+            return True
+        try:
+            attempts = self.cache.incr(attempts_key)
+        except ValueError:
+            attempts = settings.PINCODE_MAX_ATTEMPTS
+        if attempts >= settings.PINCODE_MAX_ATTEMPTS:
+            self.cache.delete_many((code_key, attempts_key))
+        return False
+
+
+class DatabasePincodeStore:
+    """Коды в отдельной таблице, строки пользователей не изменяются."""
+
+    def issue(self, user, digest, new_user=False):
+        fields = {
+            'digest': digest,
+            'attempts': 0,
+            'expires_at': timezone.now()
+            + timedelta(seconds=settings.PINCODE_TTL),
+        }
+        if new_user:
+            # У только что созданного пользователя кода еще нет
+            ConfirmationCode.objects.create(user=user, **fields)
+            return
+        codes = ConfirmationCode.objects.filter(user=user)
+        if codes.update(**fields):
+            return
+        try:
+            with transaction.atomic():
+                ConfirmationCode.objects.create(user=user, **fields)
+        except IntegrityError:
+            # Код успели выдать параллельным запросом
+            codes.update(**fields)
+
+    def check(self, user, digest):
+        codes = ConfirmationCode.objects.filter(
+            user=user,
+            expires_at__gt=timezone.now(),
+            attempts__lt=settings.PINCODE_MAX_ATTEMPTS,
+        )
+        # Неверный код (частый случай при подборе) - один UPDATE
+        if codes.exclude(digest=digest).update(attempts=F('attempts') + 1):
+            return False
+        # Удаление - атомарная проверка: код срабатывает только один раз
+        deleted, _ = codes.filter(digest=digest).delete()
+        return bool(deleted)
+
+
+def get_cache_store():
+    if settings.PINCODE_CACHE_ALIAS is None:
+        return None
+    return CachePincodeStore(settings.PINCODE_CACHE_ALIAS)
+
+
+def issue_pincode(user, new_user=False):
+    """Новый код подтверждения, предыдущий перестает действовать.
+
+    new_user - пользователь создан в этом запросе, и код в базе
+    записывается одним INSERT без поиска прежнего.
+    """
+    pincode = make_pin()
+    digest = _digest(user, pincode)
+    cache_store = get_cache_store()
+    if cache_store is not None:
+        try:
+            cache_store.issue(user, digest)
+        except Exception:
+            # Кеш недоступен - сохраняем код в базе
+            pass
+        else:
+            return pincode
+    DatabasePincodeStore().issue(user, digest, new_user)
+    return pincode
+
+
+def check_pincode(user, pincode):
+    """Проверка и погашение кода подтверждения."""
+    digest = _digest(user, pincode)
+    cache_store = get_cache_store()
+    if cache_store is not None:
+        try:
+            checked = cache_store.check(user, digest)
+        except Exception:
+            checked = None
+        if checked is not None:
+            return checked
+    return DatabasePincodeStore().check(user, digest)
@@ -0,0 +1,89 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from reviews.export import to_csv, to_ndjson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Типы, которых нет в JSON, преобразует кодировщик DRF: даты в его
+# формате, ленивые строки переводов, Decimal и т.д.
+encode_default = JSONEncoder().default
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+# Как и DRF, экранируем символы, недопустимые в строках JavaScript.
+# Поиск одного байта быстрее, а \xe2 начинает только U+2000-U+2FFF.
+JS_UNSAFE_PREFIX = b'\xe2'
+JS_UNSAFE = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Одна запись JSON на строку."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ''.join(to_ndjson([data])).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV с заголовком из ключей записи."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ''.join(to_csv([data], list(data))).encode(self.charset)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON через orjson, без него - стандартный JSONRenderer DRF.
+
+    Отступы (application/json; indent=4, браузерный API) и данные,
+    которые orjson не может закодировать, тоже отдаются DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=encode_default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if JS_UNSAFE_PREFIX in content:
+            for character, escaped in JS_UNSAFE:
+                content = content.replace(character, escaped)
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack по заголовку Accept: application/msgpack."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    available = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
@@ -0,0 +1,15 @@
+from rest_framework import routers
+
+
+class BatchRouter(routers.DefaultRouter):
+    """PATCH на адрес списка вызывает bulk_partial_update, если он есть."""
+
+    routes = [
+        routers.DefaultRouter.routes[0]._replace(
+            mapping={
+                **routers.DefaultRouter.routes[0].mapping,
+                'patch': 'bulk_partial_update',
+            }
+        ),
+        *routers.DefaultRouter.routes[1:],
+    ]
@@ -0,0 +1,185 @@
+from collections import defaultdict
+from functools import partial
+from operator import attrgetter
+
+from rest_framework.response import Response
+from reviews.models import Title
+
+from api_yamdb.metrics import measure_serialize
+
+from .cache import get_fragments
+from .serializers import (CommentSerializer, ReviewSerializer,
+                          TitleListSerializer)
+
+
+class ListRows:
+    """Сериализация списка из строк values_list() без экземпляров моделей.
+
+    Результат совпадает с serializer_class(many=True).data, в том числе
+    с полями context['fields'] и context['expand']. Значения, формат
+    которых зависит от настроек (даты, рейтинг), преобразуют поля того
+    же сериализатора. Выбираются только колонки полей ответа.
+
+    При fragments полные представления берутся из кеша фрагментов
+    (api.cache.get_fragments), сериализуются только промахи.
+    """
+
+    serializer_class = None
+    # Поле ответа: колонки, из которых оно строится
+    columns = {}
+    # Колонки связей, которые без expand выводятся слагами
+    collapsed_columns = {}
+    # Колонки, нужные постраничному выводу при любом наборе полей
+    required_columns = ('id',)
+    fragments = False
+
+    def __init__(self, context=None):
+        context = context or {}
+        self.serializer_fields = self.serializer_class().fields
+        self.names = context.get('fields') or list(self.serializer_fields)
+        self.collapsed = set()
+        if 'fields' in context:
+            self.collapsed = set(self.collapsed_columns) - set(
+                context.get('expand', ())
+            )
+        # Во фрагментах только полные представления
+        self.fragments = self.fragments and 'fields' not in context
+
+    def get_columns(self):
+        columns = list(self.required_columns)
+        if self.fragments:
+            columns.append('updated')
+        for name in self.names:
+            for column in (
+                self.collapsed_columns[name] if name in self.collapsed
+                else self.columns[name]
+            ):
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def get_queryset(self, queryset):
+        # Строки - именованные кортежи: постраничный вывод по ключу
+        # читает из них pub_date и id, как из объектов модели
+        return queryset.prefetch_related(None).values_list(
+            *self.get_columns(), named=True
+        )
+
+    def get_getter(self, name):
+        getter = getattr(self, f'get_{name}', None)
+        if getter is not None:
+            return getter
+        column = self.columns[name][0]
+        to_representation = self.serializer_fields[name].to_representation
+
+        def get_value(row):
+            value = getattr(row, column)
+            return None if value is None else to_representation(value)
+
+        return get_value
+
+    def prepare(self, rows, using):
+        """Загрузка связанных данных для строк страницы."""
+
+    def to_representation(self, rows, using):
+        if not self.fragments:
+            return self.render(rows, using)
+        return get_fragments(
+            self.serializer_class.Meta.model,
+            rows,
+            partial(self.render, using=using),
+        )
+
+    def render(self, rows, using):
+        self.prepare(rows, using)
+        getters = [(name, self.get_getter(name)) for name in self.names]
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+
+class TitleRows(ListRows):
+    serializer_class = TitleListSerializer
+    columns = {
+        'id': ('id',),
+        'name': ('name',),
+        'description': ('description',),
+        'rating': ('rating',),
+        'year': ('year',),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+    collapsed_columns = {'genre': (), 'category': ('category__slug',)}
+    fragments = True
+
+    def prepare(self, rows, using):
+        self.genres = defaultdict(list)
+        if 'genre' not in self.names:
+            return
+        # Порядок жанров - как у prefetch_related('genre')
+        genres = Title.genre.through.objects.using(using).filter(
+            title_id__in={row.id for row in rows}
+        ).order_by('genre__name', 'genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        )
+        collapsed = 'genre' in self.collapsed
+        for title_id, name, slug in genres:
+            self.genres[title_id].append(
+                slug if collapsed else {'name': name, 'slug': slug}
+            )
+
+    def get_genre(self, row):
+        return self.genres.get(row.id, [])
+
+    def get_category(self, row):
+        if row.category__slug is None or 'category' in self.collapsed:
+            return row.category__slug
+        return {'name': row.category__name, 'slug': row.category__slug}
+
+
+class ReviewRows(ListRows):
+    serializer_class = ReviewSerializer
+    columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+    required_columns = ('id', 'pub_date')
+    fragments = True
+    get_author = attrgetter('author__username')
+
+
+class CommentRows(ListRows):
+    serializer_class = CommentSerializer
+    columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+    required_columns = ('id', 'pub_date')
+    get_author = attrgetter('author__username')
+
+
+class ValuesListMixin:
+    """Список из строк values_list() вместо экземпляров моделей.
+
+    rows_class (ListRows) собирает те же данные, что и сериализатор
+    списка, но без создания объектов и обхода полей сериализатора.
+    """
+
+    rows_class = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.rows_class(self.get_serializer_context())
+        queryset = rows.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        with measure_serialize(request):
+            data = rows.to_representation(
+                queryset if page is None else page, queryset.db
+            )
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
@@ -1,12 +1,19 @@
+from contextlib import contextmanager
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from django.utils.encoding import smart_str
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
 from reviews.models import Category, Comment, Genre, Review, Title
 
 from .mixins import ValidateUsername
+from .slugs import get_slug_objects
 
 User = get_user_model()
 
@@ -62,12 +69,48 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleListSerializer(serializers.ModelSerializer):
+class SparseFieldsSerializer(serializers.ModelSerializer):
+    """Только поля из context['fields'], если он задан.
+
+    Связи из collapsed_fields, которых нет в context['expand'], при этом
+    выводятся слагами, а не вложенными объектами.
+    """
+
+    collapsed_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        names = self.context.get('fields')
+        if names is None:
+            return fields
+        expand = self.context.get('expand', ())
+        return {
+            name: (
+                self.collapsed_fields[name]()
+                if name in self.collapsed_fields and name not in expand
+                else fields[name]
+            )
+            for name in names
+        }
+
+
+class TitleListSerializer(SparseFieldsSerializer):
     """Сериализатор произведения"""
 
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField()
+    collapsed_fields = {
+        'genre': partial(
+            serializers.SlugRelatedField,
+            slug_field='slug',
+            many=True,
+            read_only=True,
+        ),
+        'category': partial(
+            serializers.SlugRelatedField, slug_field='slug', read_only=True
+        ),
+    }
 
     class Meta:
         model = Title
@@ -84,21 +127,228 @@ class TitleListSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+SLUG_FIELDS = (('genre', Genre), ('category', Category))
+
+
+def preload_slugs(context, items):
+    """Жанры и категории всех элементов: не больше запроса на модель."""
+    for name, model in SLUG_FIELDS:
+        slugs = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            values = value if isinstance(value, list) else [value]
+            slugs.update(slug for slug in values if isinstance(slug, str))
+        context.setdefault('slug_objects', {})[model] = get_slug_objects(
+            model, slugs
+        )
+
+
+def get_deleted_slug_errors(items):
+    """Ошибки по жанрам и категориям, удаленным после поиска по slug."""
+    errors = [{} for _ in items]
+    message = serializers.SlugRelatedField.default_error_messages[
+        'does_not_exist'
+    ]
+    for name, model in SLUG_FIELDS:
+        values = []
+        for attrs in items:
+            value = attrs.get(name)
+            objs = value if isinstance(value, list) else [value]
+            values.append([obj for obj in objs if obj is not None])
+        existing = set(model.objects.filter(
+            pk__in={obj.pk for objs in values for obj in objs}
+        ).values_list('pk', flat=True))
+        for error, objs in zip(errors, values):
+            deleted = [obj.slug for obj in objs if obj.pk not in existing]
+            if deleted:
+                error[name] = [
+                    message.format(slug_name='slug', value=slug)
+                    for slug in deleted
+                ]
+    return errors
+
+
+@contextmanager
+def deleted_slugs_as_errors(items, many=False):
+    """Транзакция записи произведений items.
+
+    Слаги ищутся в кеше процесса (api.slugs), и жанр или категорию могут
+    удалить между поиском и записью: нарушение внешнего ключа тогда
+    возвращается ошибкой поля, а не 500.
+    """
+    # ModelSerializer.create забирает жанры из validated_data
+    items = [dict(attrs) for attrs in items]
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError:
+        errors = get_deleted_slug_errors(items)
+        if not any(errors):
+            raise
+        raise ValidationError(errors if many else errors[0])
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Поиск по slug среди объектов, загруженных заранее для запроса."""
+
+    def to_internal_value(self, data):
+        objects = self.context.get('slug_objects', {}).get(
+            self.queryset.model
+        )
+        if objects is None:
+            return super().to_internal_value(data)
+        try:
+            return objects[data]
+        except KeyError:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+        except TypeError:
+            self.fail('invalid')
+
+
+class TitleBulkSerializer(serializers.ListSerializer):
+    """Пакетное создание и частичное изменение произведений.
+
+    Жанры и категории всех элементов ищутся одним запросом на модель,
+    запись выполняется в одной транзакции, ошибки возвращаются списком
+    по элементам. При изменении instance - словарь {id: произведение}.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.error_messages['not_a_list'].format(
+                        input_type=type(data).__name__
+                    )
+                ]
+            })
+        if not data or len(data) > settings.TITLE_BATCH_MAX_SIZE:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [_(
+                    'Передайте от 1 до {} произведений'
+                ).format(settings.TITLE_BATCH_MAX_SIZE)]
+            })
+        preload_slugs(self.context, data)
+        validated, errors, seen = [], [], set()
+        for item in data:
+            try:
+                attrs = self.child.run_validation(item)
+                if self.instance is not None:
+                    attrs['id'] = self.validate_id(item, seen)
+            except ValidationError as error:
+                errors.append(error.detail)
+            else:
+                validated.append(attrs)
+                errors.append({})
+        if any(errors):
+            raise ValidationError(errors)
+        return validated
+
+    def validate_id(self, item, seen):
+        pk = item.get('id')
+        if pk not in self.instance:
+            raise ValidationError({'id': [_('Произведение не найдено')]})
+        if pk in seen:
+            raise ValidationError(
+                {'id': [_('Произведение уже есть в пакете')]}
+            )
+        seen.add(pk)
+        return pk
+
+    def set_genres(self, genres, replace=False):
+        through = Title.genre.through
+        if replace:
+            through.objects.filter(title_id__in=genres).delete()
+        # Повтор слага в элементе нарушил бы уникальность пары в БД
+        through.objects.bulk_create(
+            through(title_id=pk, genre_id=genre.pk)
+            for pk, items in genres.items()
+            for genre in dict.fromkeys(items)
+        )
+
+    def reload(self, titles):
+        """Произведения с жанрами и категорией для ответа."""
+        loaded = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).in_bulk([title.pk for title in titles])
+        return [loaded[title.pk] for title in titles]
+
+    def create(self, validated_data):
+        titles = [
+            Title(**{
+                name: value for name, value in attrs.items()
+                if name != 'genre'
+            })
+            for attrs in validated_data
+        ]
+        with deleted_slugs_as_errors(validated_data, many=True):
+            features = connections[Title.objects.db].features
+            if features.can_return_ids_from_bulk_insert:
+                Title.objects.bulk_create(titles)
+            else:
+                for title in titles:
+                    title.save()
+            self.set_genres({
+                title.pk: attrs.get('genre', ())
+                for title, attrs in zip(titles, validated_data)
+            })
+        return self.reload(titles)
+
+    def update(self, instance, validated_data):
+        titles, fields, genres = [], {'updated'}, {}
+        now = timezone.now()
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            title = instance[attrs.pop('id')]
+            if 'genre' in attrs:
+                genres[title.pk] = attrs.pop('genre')
+            for name, value in attrs.items():
+                setattr(title, name, value)
+            fields.update(attrs)
+            # bulk_update не заполняет auto_now
+            title.updated = now
+            titles.append(title)
+        with deleted_slugs_as_errors(validated_data, many=True):
+            Title.objects.bulk_update(titles, fields)
+            if genres:
+                self.set_genres(genres, replace=True)
+        return self.reload(titles)
+
+
 class TitleSerializer(serializers.ModelSerializer):
 
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         slug_field='slug', queryset=Genre.objects.all(), many=True
     )
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'description', 'year', 'genre', 'category')
+        list_serializer_class = TitleBulkSerializer
+
+    def to_internal_value(self, data):
+        # В пакете слаги уже загружены TitleBulkSerializer
+        if 'slug_objects' not in self.context:
+            preload_slugs(self.context, [data])
+        return super().to_internal_value(data)
 
+    def create(self, validated_data):
+        with deleted_slugs_as_errors([validated_data]):
+            return super().create(validated_data)
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        with deleted_slugs_as_errors([validated_data]):
+            return super().update(instance, validated_data)
+
+
+class ReviewSerializer(SparseFieldsSerializer):
     """Сериализатор обзоров"""
 
     author = serializers.SlugRelatedField(
@@ -116,24 +366,26 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        request = self.context['request']
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(
-                title=get_object_or_404(
-                    Title, pk=self.context['view'].kwargs.get('title_id')
-                ),
-                author=request.user,
-            ).exists()
-        ):
-            raise ValidationError(
-                _('Вы не можете добавить более одного отзыва')
-            )
-        return data
-
-
-class CommentSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_reviews в БД
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # Запрос только при ошибке: другие нарушения - не повтор
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author'],
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    _('Вы не можете добавить более одного отзыва')
+                ]
+            })
+
+
+class CommentSerializer(SparseFieldsSerializer):
     author = serializers.SlugRelatedField(
         default=serializers.CurrentUserDefault(),
         slug_field='username',
@@ -0,0 +1,25 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.bulk_import import rows_imported
+from reviews.models import Category, Genre, Review, Title, User
+
+from .authentication import invalidate_user
+from .versions import bump_version
+
+CACHED_MODELS = (Title, Genre, Category, Review)
+
+
+def bump_model_version(sender, **kwargs):
+    bump_version(sender)
+
+
+def bump_title_version(sender, **kwargs):
+    bump_version(Title)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+m2m_changed.connect(bump_title_version, sender=Title.genre.through)
+rows_imported.connect(bump_model_version)
+post_save.connect(invalidate_user, sender=User)
+post_delete.connect(invalidate_user, sender=User)
@@ -0,0 +1,54 @@
+from time import monotonic
+
+from django.conf import settings
+from django.db import router
+from reviews.models import Category, Genre
+
+from .versions import get_versions
+
+
+class SlugResolver:
+    """slug -> id с кешем в памяти процесса.
+
+    Кеш сбрасывается при смене версии модели (api.versions), а версия
+    меняется при сохранении и удалении записей (api.signals). Изменения
+    в обход сигналов видны не позже SLUG_RESOLVER_TIMEOUT секунд. Запись
+    с удаленным за это время id сериализатор возвращает ошибкой поля.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.ids = {}
+        self.version = None
+        self.loaded_at = None
+
+    def get_ids(self, slugs):
+        version, = get_versions((self.model,))
+        now = monotonic()
+        if version != self.version or (
+            now - self.loaded_at >= settings.SLUG_RESOLVER_TIMEOUT
+        ):
+            self.ids, self.version, self.loaded_at = {}, version, now
+        missing = set(slugs) - self.ids.keys()
+        if missing:
+            self.ids.update(
+                self.model.objects.filter(slug__in=missing).values_list(
+                    'slug', 'id'
+                )
+            )
+        return {slug: self.ids[slug] for slug in slugs if slug in self.ids}
+
+    def get_objects(self, slugs):
+        """Объекты только с id и slug: для записи связей и ответа."""
+        db = router.db_for_read(self.model)
+        return {
+            slug: self.model.from_db(db, ('id', 'slug'), (pk, slug))
+            for slug, pk in self.get_ids(slugs).items()
+        }
+
+
+RESOLVERS = {model: SlugResolver(model) for model in (Genre, Category)}
+
+
+def get_slug_objects(model, slugs):
+    return RESOLVERS[model].get_objects(slugs)
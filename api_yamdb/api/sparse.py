@@ -0,0 +1,96 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsMixin:
+    """Параметры fields и expand при чтении списка и объекта.
+
+    fields - поля ответа через запятую, expand - связи (genre,
+    category), которые при заданном fields выводятся вложенными
+    объектами, а не слагами. Без fields ответ полный. Колонки и связи
+    полей, которых нет в ответе, не загружаются из БД.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    sparse_actions = ('list', 'retrieve')
+
+    def get_query_list(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    @cached_property
+    def sparse_fields(self):
+        """Поля и раскрываемые связи из запроса: словарь для контекста."""
+        if self.action not in self.sparse_actions:
+            return {}
+        fields = self.get_query_list(self.fields_query_param)
+        expand = self.get_query_list(self.expand_query_param) or []
+        serializer_class = self.get_serializer_class()
+        available = serializer_class.Meta.fields
+        errors = {}
+        if fields is not None and not fields:
+            errors[self.fields_query_param] = [_('Укажите поля ответа')]
+        unknown = set(fields or ()) - set(available)
+        if unknown:
+            errors[self.fields_query_param] = [
+                _('Неизвестные поля: {}').format(', '.join(sorted(unknown)))
+            ]
+        unknown = set(expand) - set(serializer_class.collapsed_fields)
+        if unknown:
+            errors[self.expand_query_param] = [
+                _('Нельзя раскрыть поля: {}').format(
+                    ', '.join(sorted(unknown))
+                )
+            ]
+        if errors:
+            raise ValidationError(errors)
+        if fields is None:
+            return {}
+        # Порядок полей - как в полном ответе
+        return {
+            'fields': [name for name in available if name in fields],
+            'expand': set(expand),
+        }
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), **self.sparse_fields}
+
+    def get_queryset(self):
+        return self.trim_queryset(super().get_queryset())
+
+    def trim_queryset(self, queryset):
+        """Без колонок и связей полей, которых нет в ответе."""
+        if 'fields' not in self.sparse_fields:
+            return queryset
+        fields = self.get_serializer_class()().fields
+        unused = {
+            field.source for name, field in fields.items()
+            if name not in self.sparse_fields['fields']
+        }
+        deferred, skipped = [], set()
+        for source in unused:
+            try:
+                model_field = queryset.model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if model_field.primary_key:
+                continue
+            if model_field.is_relation:
+                skipped.add(source)
+            if model_field.concrete:
+                deferred.append(source)
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            queryset = queryset.select_related(None).select_related(*(
+                lookup for lookup in select_related if lookup not in skipped
+            ))
+        return queryset.prefetch_related(None).prefetch_related(*(
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup).split('__')[0]
+            not in skipped
+        )).defer(*deferred)
@@ -1,11 +1,12 @@
 from django.urls import include, path
-from rest_framework import routers
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, Signup, TitleViewSet, Token, UserViewSet)
+from .routers import BatchRouter
+from .views import (CategoryViewSet, CommentViewSet, DatabaseStatsView,
+                    ExportView, GenreViewSet, ProfileTokenView, ReviewViewSet,
+                    Signup, TitleViewSet, Token, UserViewSet)
 
 app_name = 'api'
-router_v1 = routers.DefaultRouter()
+router_v1 = BatchRouter()
 router_v1.register('users', UserViewSet, basename='users')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('titles', TitleViewSet, basename='titles')
@@ -26,5 +27,16 @@ auth_v1 = [
 
 urlpatterns = [
     path('v1/', include(auth_v1)),
+    path('v1/export/<str:resource>/', ExportView.as_view(), name='export'),
+    path(
+        'v1/internal/database/',
+        DatabaseStatsView.as_view(),
+        name='database-stats',
+    ),
+    path(
+        'v1/internal/profile-token/',
+        ProfileTokenView.as_view(),
+        name='profile-token',
+    ),
     path('v1/', include(router_v1.urls)),
 ]
@@ -0,0 +1,65 @@
+from time import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'api:version:{}'
+
+
+def get_version_cache():
+    # Версию, измененную одним процессом, должны увидеть все остальные
+    return caches[settings.SHARED_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_versions(models):
+    """Текущие версии данных моделей.
+
+    Версия - случайная метка, а не счетчик: если метка вытеснена из кеша,
+    новая не совпадет ни с одной из прежних и старые ответы не вернутся.
+    После двоеточия - время смены версии, 0 - если она неизвестна.
+    """
+    cache = get_version_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, f'{uuid4().hex}:0', None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """Новая версия данных модели делает недействительными ответы с ней.
+
+    Версия меняется и при удалении записей, поэтому время смены годится
+    для Last-Modified списка, в отличие от даты изменения строк.
+    """
+    get_version_cache().set(
+        _version_key(model), f'{uuid4().hex}:{time()}', None
+    )
+
+
+def get_bumped_at(version):
+    """Время смены версии или None, если оно неизвестно."""
+    _, _, bumped_at = str(version).partition(':')
+    try:
+        return float(bumped_at) or None
+    except ValueError:
+        return None
+
+
+def is_recently_bumped(versions):
+    """Менялась ли версия за последние REPLICA_PIN_SECONDS секунд.
+
+    Реплики в это время могут еще не получить изменение, и ответ из них
+    попал бы в кеш под новой версией.
+    """
+    border = time() - settings.REPLICA_PIN_SECONDS
+    return any(
+        (get_bumped_at(version) or 0) > border for version in versions
+    )
@@ -1,26 +1,42 @@
+import os
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, connections
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.export import EXPORTERS, export
+from reviews.models import Category, Comment, Genre, Review, Title
+
+from api_yamdb.backends.pool import get_pool_stats
+from api_yamdb.profiling import make_profile_token
 
-from .filters import TitleFilter
+from .cache import CachedResponseMixin, FragmentCacheMixin
+from .conditional import ConditionalGetMixin
+from .filters import TitleFilter, TitleOrderingFilter
+from .pagination import ReviewCommentPagination
 from .permissions import (IsAdmin, IsAdminModeratorAuthorOrReadOnly,
                           IsAdminOrReadOnly)
+from .pincodes import check_pincode, issue_pincode
+from .renderers import CSVRenderer, NDJSONRenderer
+from .rows import CommentRows, ReviewRows, TitleRows, ValuesListMixin
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer, SignupSerializer,
                           TitleListSerializer, TitleSerializer,
                           TokenSerializer, UserSerializer)
-from .utils import make_pin, send_pincode
+from .sparse import SparseFieldsMixin
+from .utils import send_pincode
+from .versions import bump_version
 
 User = get_user_model()
 
@@ -46,10 +62,7 @@ class Signup(APIView):
                 {'username': _('Пользователь с такими данными уже есть.')},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        pincode = make_pin()
-        send_pincode(user, pincode)
-        user.pincode = pincode
-        user.save()
+        send_pincode(user, issue_pincode(user, new_user=created))
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -63,18 +76,13 @@ class Token(APIView):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = get_object_or_404(User, username=request.data['username'])
-        if (
-            user.pincode != settings.DEFAULT_PINCODE
-            and user.pincode == serializer.data['confirmation_code']
-        ):
+        if check_pincode(user, serializer.data['confirmation_code']):
             return Response(
                 {'token': str(RefreshToken.for_user(user).access_token)},
                 status=status.HTTP_201_CREATED,
             )
-        # Пинкод сбрасываем на дефолтный, в случае если передан неверный,
-        # чтобы избежать подбора
-        user.pincode = settings.DEFAULT_PINCODE
-        user.save()
+        # Код одноразовый, а после PINCODE_MAX_ATTEMPTS неверных попыток
+        # перестает действовать, чтобы избежать подбора
         return Response(
             {
                 'confirmation_code': _(
@@ -101,47 +109,106 @@ class UserViewSet(viewsets.ModelViewSet):
         pagination_class=None,
     )
     def me(self, request):
+        # В request.user загружены только поля для проверки прав
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             return Response(
-                UserSerializer(request.user).data, status=status.HTTP_200_OK
+                UserSerializer(user).data, status=status.HTTP_200_OK
             )
-        serializer = UserSerializer(
-            request.user, data=request.data, partial=True
-        )
+        serializer = UserSerializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save(role=request.user.role)
+        serializer.save(role=user.role)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class NestedParentMixin:
+    """Родительский объект вложенного маршрута.
+
+    Загружается один раз за запрос и доступен сериализатору через
+    context['view']. parent_lookups - поле модели: параметр адреса,
+    все параметры проверяются одним запросом.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    @cached_property
+    def parent(self):
+        return get_object_or_404(
+            self.parent_model,
+            **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            },
+        )
+
+
+class ReviewViewSet(
+    NestedParentMixin,
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+    FragmentCacheMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ReviewSerializer
+    rows_class = ReviewRows
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
-
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+    pagination_class = ReviewCommentPagination
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(author=self.request.user, title=self.parent)
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.parent.reviews.select_related('author')
+
+    def get_validator_queryset(self):
+        # Дата изменения произведения обновляется при любом изменении
+        # его отзывов, поэтому для списка достаточно одной строки
+        if self.action == 'retrieve':
+            return Review.objects.filter(
+                pk=self.kwargs.get('pk'), title_id=self.kwargs.get('title_id')
+            )
+        return Title.objects.filter(pk=self.kwargs.get('title_id'))
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    NestedParentMixin,
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = CommentSerializer
+    rows_class = CommentRows
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
-
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+    pagination_class = ReviewCommentPagination
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.parent.comments.select_related('author')
+
+    def get_validator_queryset(self):
+        if self.action == 'retrieve':
+            return Comment.objects.filter(
+                pk=self.kwargs.get('pk'),
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            )
+        return Review.objects.filter(
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=self.request.user, review=self.parent)
 
 
 class CategoryGenreCommonViewSet(
+    CachedResponseMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -161,6 +228,7 @@ class GenreViewSet(CategoryGenreCommonViewSet):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
 
 
 class CategoryViewSet(CategoryGenreCommonViewSet):
@@ -168,21 +236,124 @@ class CategoryViewSet(CategoryGenreCommonViewSet):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = (Category,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+    FragmentCacheMixin,
+    viewsets.ModelViewSet,
+):
     """Произведение"""
 
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+    # Жанры одного объекта загружаются одним запросом и без
+    # prefetch_related, а при попадании в кеш фрагментов не нужны
+    queryset = Title.objects.select_related('category')
     serializer_class = TitleSerializer
     list_serializer_class = TitleListSerializer
+    rows_class = TitleRows
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    cache_models = (Title, Genre, Category, Review)
+    validator_models = cache_models
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filter_class = TitleFilter
     ordering = ('name', '-rating')
     ordering_fields = ('name', 'rating', 'year')
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.save_batch(request, status.HTTP_201_CREATED)
+        return super().create(request, *args, **kwargs)
+
+    def bulk_partial_update(self, request, *args, **kwargs):
+        """PATCH со списком произведений на адрес списка."""
+        ids = [
+            item.get('id') for item in request.data
+            if isinstance(item, dict)
+        ] if isinstance(request.data, list) else []
+        instances = Title.objects.in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        return self.save_batch(
+            request, status.HTTP_200_OK, instance=instances, partial=True
+        )
+
+    def save_batch(self, request, response_status, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, many=True, **kwargs
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        # Пакетная запись не отправляет сигналы сохранения
+        bump_version(Title)
+        return Response(serializer.data, status=response_status)
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return self.list_serializer_class
         return self.serializer_class
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка каталога в NDJSON или CSV для аналитики."""
+
+    permission_classes = (IsAdmin,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, resource):
+        if resource not in EXPORTERS:
+            raise NotFound()
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            export(resource, renderer.format),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{renderer.format}"'
+        )
+        return response
+
+
+class DatabaseStatsView(APIView):
+    """Настройки соединений с БД и статистика пула процесса.
+
+    Пул у каждого процесса gunicorn свой, ответ относится к процессу pid.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        databases = {}
+        for alias in connections:
+            connection = connections[alias]
+            databases[alias] = {
+                'engine': connection.settings_dict['ENGINE'],
+                'vendor': connection.vendor,
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                # Настройка действует, только если ее поддерживает бэкенд
+                'health_checks': getattr(
+                    connection, 'health_check_enabled', False
+                ),
+                'pool': get_pool_stats(alias),
+            }
+        return Response({'pid': os.getpid(), 'databases': databases})
+
+
+class ProfileTokenView(APIView):
+    """Токен для профилирования запросов через заголовок X-Profile."""
+
+    permission_classes = (IsAdmin,)
+
+    def post(self, request):
+        return Response({
+            'token': make_profile_token(request.user),
+            'expires_in': settings.PROFILE_TOKEN_MAX_AGE,
+        })
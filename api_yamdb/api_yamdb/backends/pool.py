@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import deque
+from time import monotonic
+
+
+class PoolTimeoutError(Exception):
+    """Свободное соединение не появилось за время ожидания."""
+
+
+class ConnectionPool:
+    """Пул соединений с БД внутри процесса, общий для всех его потоков.
+
+    Соединений не больше max_size, простаивающие дольше idle_timeout
+    секунд закрываются, поток ждет свободное соединение не дольше
+    wait_timeout секунд.
+    """
+
+    def __init__(self, max_size, idle_timeout, wait_timeout):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.pid = os.getpid()
+        self.condition = threading.Condition()
+        # Пары (соединение, время возврата в пул), новые справа
+        self.idle = deque()
+        self.in_use = 0
+        self.acquired = 0
+        self.created = 0
+        self.closed = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+
+    def close_connection(self, connection):
+        self.closed += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_expired(self):
+        expired = monotonic() - self.idle_timeout
+        while self.idle and self.idle[0][1] < expired:
+            self.close_connection(self.idle.popleft()[0])
+
+    def take(self):
+        """Свободное соединение или None, если можно открыть новое."""
+        started = monotonic()
+        deadline = started + self.wait_timeout
+        waited = False
+        with self.condition:
+            self.close_expired()
+            while not self.idle and self.in_use >= self.max_size:
+                waited = True
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(
+                        f'Нет свободных соединений в пуле за '
+                        f'{self.wait_timeout} с (максимум {self.max_size})'
+                    )
+                self.condition.wait(remaining)
+            self.in_use += 1
+            self.acquired += 1
+            if waited:
+                wait_time = monotonic() - started
+                self.waits += 1
+                self.wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+            # Последнее возвращенное соединение: старые успевают истечь
+            return self.idle.pop()[0] if self.idle else None
+
+    def acquire(self, connect, check=None):
+        """Соединение из пула или новое, открытое функцией connect.
+
+        check проверяет соединение из пула, негодное закрывается.
+        """
+        while True:
+            connection = self.take()
+            if connection is None:
+                break
+            if check is None or check(connection):
+                return connection
+            self.release(connection, reusable=False)
+        try:
+            connection = connect()
+        except Exception:
+            self.release(None, reusable=False)
+            raise
+        with self.condition:
+            self.created += 1
+        return connection
+
+    def release(self, connection, reusable=True):
+        with self.condition:
+            self.in_use -= 1
+            if reusable:
+                self.idle.append((connection, monotonic()))
+            elif connection is not None:
+                self.close_connection(connection)
+            self.close_expired()
+            self.condition.notify()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'max_size': self.max_size,
+                'size': self.in_use + len(self.idle),
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'acquired': self.acquired,
+                'created': self.created,
+                'closed': self.closed,
+                'waits': self.waits,
+                'wait_time': round(self.wait_time, 6),
+                'max_wait_time': round(self.max_wait_time, 6),
+                'timeouts': self.timeouts,
+                'idle_timeout': self.idle_timeout,
+                'wait_timeout': self.wait_timeout,
+            }
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    """Пул для базы alias, после fork процесс получает новый пул."""
+    with _lock:
+        pool = _pools.get(alias)
+        if pool is not None and pool.pid == os.getpid():
+            return pool
+        _pools[alias] = ConnectionPool(
+            max_size=options['MAX_SIZE'],
+            idle_timeout=options.get('IDLE_TIMEOUT', 300),
+            wait_timeout=options.get('WAIT_TIMEOUT', 5),
+        )
+        return _pools[alias]
+
+
+def get_pool_stats(alias):
+    """Статистика пула этого процесса или None, если пула нет."""
+    pool = _pools.get(alias)
+    if pool is None or pool.pid != os.getpid():
+        return None
+    return pool.stats()
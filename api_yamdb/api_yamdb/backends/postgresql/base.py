@@ -0,0 +1,103 @@
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from ..pool import PoolTimeoutError, get_pool
+
+Database = base.Database
+
+
+def is_usable(connection):
+    try:
+        connection.cursor().execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с проверкой постоянных соединений и пулом.
+
+    При CONN_HEALTH_CHECKS соединение, пережившее прошлый запрос,
+    проверяется перед первым обращением к БД в новом запросе. Если в
+    POOL задан MAX_SIZE, соединения берутся из общего для потоков
+    процесса пула и возвращаются в него при закрытии.
+    """
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__(settings_dict, *args, **kwargs)
+        self.health_check_enabled = settings_dict.get(
+            'CONN_HEALTH_CHECKS', False
+        )
+        self.health_check_done = False
+
+    def get_pool(self):
+        options = self.settings_dict.get('POOL') or {}
+        if not options.get('MAX_SIZE'):
+            return None
+        return get_pool(self.alias, options)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            connection = pool.acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(
+                    conn_params
+                ),
+                check=is_usable if self.health_check_enabled else None,
+            )
+        except PoolTimeoutError as error:
+            raise Database.OperationalError(str(error)) from error
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def reset_connection(self):
+        """Готовит соединение к возврату в пул, False - если оно негодно."""
+        if self.connection.closed or self.in_atomic_block:
+            return False
+        status = self.connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                self.connection.rollback()
+            except Database.Error:
+                return False
+        return True
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None:
+            return super()._close()
+        # Внутри atomic Django оставляет ссылку на закрытое соединение,
+        # поэтому такое соединение в пул не возвращается
+        with self.wrap_database_errors:
+            pool.release(self.connection, reusable=self.reset_connection())
+        return None
+
+    def close_if_unusable_or_obsolete(self):
+        # Вызывается в начале и в конце каждого запроса
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+        if not is_usable(self.connection):
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,151 @@
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+# При равном весе в Accept-Encoding brotli сжимает лучше
+PREFERENCE = ('br', 'gzip')
+
+
+class GzipCompressor:
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS
+        )
+
+    def process(self, data):
+        return self.compressor.compress(data)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+
+    def process(self, data):
+        return self.compressor.process(data)
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def get_compressors():
+    compressors = {'gzip': GzipCompressor}
+    if brotli is not None:
+        compressors['br'] = BrotliCompressor
+    return compressors
+
+
+def parse_accept_encoding(header):
+    """Вес q каждой кодировки из заголовка Accept-Encoding."""
+    weights = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    return weights
+
+
+def choose_encoding(header, available):
+    """Кодировка с наибольшим весом q > 0 или None."""
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for encoding in PREFERENCE:
+        if encoding not in available:
+            continue
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress_stream(compressor, chunks):
+    for chunk in chunks:
+        # Компрессор копит данные и отдает их блоками, без сброса на
+        # каждой строке выгрузки сжатие не ухудшается
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Сжатие ответов gzip или brotli по заголовку Accept-Encoding.
+
+    Сжимаются ответы с типом из COMPRESSION_CONTENT_TYPES больше
+    COMPRESSION_MIN_SIZE байт: мелкие ответы, например с токенами, не
+    сжимаются. Потоковые ответы сжимаются по мере отдачи. Сильный ETag
+    становится слабым: тело отличается от несжатого побайтово, а
+    ConditionalGetMixin выдает только слабые ETag, одинаковые для
+    любого сжатия.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressors = get_compressors()
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), compressors
+        )
+        if encoding is None:
+            return response
+        compressor = compressors[encoding]()
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                compressor, response.streaming_content
+            )
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            content = compressor.process(response.content)
+            content += compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        # Range и no-transform требуют отдать тело как есть
+        if response.status_code == 206 or 'no-transform' in response.get(
+            'Cache-Control', ''
+        ):
+            return False
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(settings.COMPRESSION_CONTENT_TYPES):
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
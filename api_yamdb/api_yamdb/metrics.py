@@ -0,0 +1,246 @@
+import glob
+import json
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Имя метрики, описание, ключ замера и границы корзин гистограммы
+METRICS = (
+    (
+        'yamdb_request_duration_seconds', 'Время обработки запроса',
+        'total', DURATION_BUCKETS,
+    ),
+    (
+        'yamdb_request_db_duration_seconds', 'Суммарное время SQL-запросов',
+        'db', DURATION_BUCKETS,
+    ),
+    (
+        'yamdb_request_serialize_duration_seconds',
+        'Время сериализации и рендера ответа без SQL-запросов',
+        'serialize', DURATION_BUCKETS,
+    ),
+    (
+        'yamdb_request_db_queries', 'Число SQL-запросов',
+        'queries', QUERY_BUCKETS,
+    ),
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class Registry:
+    """Гистограммы замеров по маршрутам внутри процесса.
+
+    Если задан settings.METRICS_DIR, процесс не чаще раза в
+    METRICS_FLUSH_INTERVAL секунд сохраняет свои гистограммы в файл
+    <pid>.json, и /metrics складывает файлы всех процессов gunicorn.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.flushed_at = 0.0
+
+    def observe(self, route, method, timings):
+        labels = f'{route}|{method}'
+        with self.lock:
+            for name, _, key, buckets in METRICS:
+                histogram = self.histograms.setdefault(name, {}).setdefault(
+                    labels,
+                    {'buckets': [0] * len(buckets), 'sum': 0, 'count': 0},
+                )
+                value = timings[key]
+                for index, bound in enumerate(buckets):
+                    if value <= bound:
+                        histogram['buckets'][index] += 1
+                histogram['sum'] += value
+                histogram['count'] += 1
+        if settings.METRICS_DIR and (
+            monotonic() - self.flushed_at >= settings.METRICS_FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.histograms))
+
+    def flush(self):
+        self.flushed_at = monotonic()
+        path = os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Гистограммы всех процессов, включая завершившиеся."""
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+        self.flush()
+        merged = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            with open(path) as file:
+                snapshot = json.load(file)
+            for name, series in snapshot.items():
+                for labels, histogram in series.items():
+                    total = merged.setdefault(name, {}).setdefault(
+                        labels,
+                        {
+                            'buckets': [0] * len(histogram['buckets']),
+                            'sum': 0,
+                            'count': 0,
+                        },
+                    )
+                    total['buckets'] = [
+                        left + right for left, right
+                        in zip(total['buckets'], histogram['buckets'])
+                    ]
+                    total['sum'] += histogram['sum']
+                    total['count'] += histogram['count']
+        return merged
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return (
+        value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    )
+
+
+def render_metrics(histograms):
+    """Гистограммы в текстовом формате Prometheus."""
+    lines = []
+    for name, description, _, buckets in METRICS:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, histogram in sorted(histograms.get(name, {}).items()):
+            route, method = labels.rsplit('|', 1)
+            label = f'route="{_escape(route)}",method="{method}"'
+            for bound, count in zip(buckets, histogram['buckets']):
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(
+                f'{name}_bucket{{{label},le="+Inf"}} {histogram["count"]}'
+            )
+            lines.append(f'{name}_sum{{{label}}} {histogram["sum"]}')
+            lines.append(f'{name}_count{{{label}}} {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render_metrics(registry.collect()), content_type=CONTENT_TYPE
+    )
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.url_name or match.route or UNMATCHED_ROUTE
+
+
+class RequestTimer:
+    """Замеры одного запроса: SQL-запросы и сериализация ответа."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serialize_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обертка execute_wrapper для всех запросов соединения
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+    def start_serialize(self):
+        self.serialize_started = (perf_counter(), self.db)
+
+    def stop_serialize(self, response=None):
+        # SQL-запросы сериализации уже учтены в db
+        started, db = self.serialize_started
+        self.serialize += perf_counter() - started - (self.db - db)
+
+    def get_timings(self):
+        return {
+            'total': perf_counter() - self.started,
+            'db': self.db,
+            'serialize': self.serialize,
+            'queries': self.queries,
+        }
+
+
+def format_server_timing(timings):
+    return ', '.join((
+        f'db;dur={timings["db"] * 1000:.3f};'
+        f'desc="{timings["queries"]} queries"',
+        f'serialize;dur={timings["serialize"] * 1000:.3f}',
+        f'total;dur={timings["total"] * 1000:.3f}',
+    ))
+
+
+@contextmanager
+def measure_serialize(request):
+    """Замер построения данных ответа представлением в метрике serialize."""
+    timer = getattr(request, 'metrics_timer', None)
+    if timer is None:
+        yield
+        return
+    timer.start_serialize()
+    try:
+        yield
+    finally:
+        timer.stop_serialize()
+
+
+class MetricsMiddleware:
+    """Число и время SQL-запросов, время сериализации и всего запроса.
+
+    Сериализация - рендер ответа и построение его данных там, где
+    представление обернуло его в measure_serialize() (строки списков,
+    фрагменты), без времени SQL-запросов внутри.
+
+    Замеры попадают в гистограммы маршрута (имя из urls.py, например
+    titles-list), при settings.SERVER_TIMING - и в заголовок
+    Server-Timing ответа. Запросы потокового ответа, выполненные после
+    выхода из представления, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = request.metrics_timer = RequestTimer()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(timer)
+                )
+            response = self.get_response(request)
+        timings = timer.get_timings()
+        registry.observe(get_route(request), request.method, timings)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = format_server_timing(timings)
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответы DRF рендерятся сразу после этого вызова
+        request.metrics_timer.start_serialize()
+        response.add_post_render_callback(request.metrics_timer.stop_serialize)
+        return response
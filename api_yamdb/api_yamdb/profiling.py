@@ -0,0 +1,192 @@
+import cProfile
+import io
+import pstats
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core import signing
+from django.db import DatabaseError, connections
+from reviews.models import RequestProfile, SlowQuery, User
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_SALT = 'api_yamdb.profiling'
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN',
+    'mysql': 'EXPLAIN',
+    'sqlite': 'EXPLAIN QUERY PLAN',
+}
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def make_profile_token(user):
+    """Подписанный токен для заголовка X-Profile."""
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign(user.username)
+
+
+def get_profile_user(request):
+    """Имя администратора из заголовка X-Profile или None.
+
+    Роль проверяется при каждом использовании токена: у пользователя,
+    переставшего быть администратором, токен больше не действует.
+    """
+    token = request.META.get(PROFILE_HEADER)
+    if not token:
+        return None
+    try:
+        username = signing.TimestampSigner(salt=PROFILE_SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    user = User.objects.filter(username=username, is_active=True).only(
+        'role', 'is_staff'
+    ).first()
+    if user is None or not user.is_admin:
+        return None
+    return username
+
+
+def get_view_name(request):
+    """Имя представления, например TitleViewSet.list."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return ''
+    view_class = getattr(match.func, 'cls', None) or getattr(
+        match.func, 'view_class', None
+    )
+    if view_class is None:
+        return match.view_name
+    actions = getattr(match.func, 'actions', None) or {}
+    method = request.method.lower()
+    return f'{view_class.__name__}.{actions.get(method, method)}'
+
+
+def trim(model, size):
+    """Удаление записей старше последних size: кольцевой буфер."""
+    cutoff = list(
+        model.objects.order_by('-pk').values_list('pk', flat=True)[
+            size - 1:size
+        ]
+    )
+    if cutoff:
+        model.objects.filter(pk__lt=cutoff[0]).delete()
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if (
+        prefix is None
+        or params is None
+        or not sql.lstrip().upper().startswith(EXPLAINABLE)
+    ):
+        return ''
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'Не удалось получить план: {error}'
+
+
+class SlowQueryRecorder:
+    """Обертка execute_wrapper, запоминающая медленные запросы."""
+
+    def __init__(self, alias, queries):
+        self.alias = alias
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - started
+            if duration >= settings.SLOW_QUERY_THRESHOLD:
+                self.record(duration, sql, params, many, context)
+
+    def record(self, duration, sql, params, many, context):
+        connection = context['connection']
+        try:
+            executed = connection.ops.last_executed_query(
+                context['cursor'], sql, params
+            )
+        except Exception:
+            executed = sql
+        # План executemany по одному SQL с набором параметров не получить
+        self.queries.append(
+            (duration, self.alias, executed, sql, None if many else params)
+        )
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса и журнал медленных SQL-запросов.
+
+    Запрос с заголовком X-Profile (токен выдается администратору по
+    адресу /api/v1/internal/profile-token/) выполняется под cProfile,
+    статистика сохраняется в RequestProfile, ее id возвращается в
+    заголовке X-Profile-Id. Запросы к БД дольше SLOW_QUERY_THRESHOLD
+    секунд сохраняются в SlowQuery с планом выполнения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested_by = get_profile_user(request)
+        queries = []
+        profile = None
+        started = perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(
+                    SlowQueryRecorder(alias, queries)
+                ))
+            if requested_by is not None:
+                profile = cProfile.Profile()
+                profile.enable()
+                stack.callback(profile.disable)
+            response = self.get_response(request)
+        duration = perf_counter() - started
+        if queries:
+            self.save_slow_queries(request, queries)
+        if profile is not None:
+            response['X-Profile-Id'] = self.save_profile(
+                request, profile, requested_by, duration
+            )
+        return response
+
+    def save_slow_queries(self, request, queries):
+        queries = sorted(queries, key=lambda query: query[0], reverse=True)
+        view = get_view_name(request)
+        path = request.get_full_path()
+        SlowQuery.objects.bulk_create(
+            SlowQuery(
+                database=alias,
+                view=view,
+                path=path,
+                sql=executed,
+                duration=duration,
+                explain=explain(alias, sql, params),
+            )
+            for duration, alias, executed, sql, params
+            in queries[:settings.SLOW_QUERY_PER_REQUEST]
+        )
+        trim(SlowQuery, settings.SLOW_QUERY_LOG_SIZE)
+
+    def save_profile(self, request, profile, requested_by, duration):
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats(
+            'cumulative'
+        ).print_stats(settings.REQUEST_PROFILE_STATS_LIMIT)
+        record = RequestProfile.objects.create(
+            requested_by=requested_by,
+            method=request.method,
+            view=get_view_name(request),
+            path=request.get_full_path(),
+            duration=duration,
+            stats=stream.getvalue(),
+        )
+        trim(RequestProfile, settings.REQUEST_PROFILE_LOG_SIZE)
+        return record.pk
@@ -0,0 +1,108 @@
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'use_primary'
+PIN_KEY = 'replica:pin:{}'
+
+
+class _State(threading.local):
+    # Вне HTTP-запросов (команды, cron) все идет в основную базу
+    pinned = True
+    written = False
+
+
+_state = _State()
+
+
+def pin_to_primary():
+    """Чтение до конца запроса из основной базы."""
+    _state.pinned = True
+
+
+def get_pin_cache():
+    # Следующий запрос пользователя может попасть в другой процесс
+    return caches[settings.SHARED_CACHE_ALIAS]
+
+
+def pin_user(user_id):
+    """Чтение пользователя из основной базы REPLICA_PIN_SECONDS секунд."""
+    if settings.REPLICA_DATABASES and settings.REPLICA_PIN_SECONDS > 0:
+        get_pin_cache().set(
+            PIN_KEY.format(user_id), 1, settings.REPLICA_PIN_SECONDS
+        )
+
+
+def pin_pinned_user(user_id):
+    """Чтение из основной базы, если пользователь недавно писал."""
+    if settings.REPLICA_DATABASES and not _state.pinned and (
+        get_pin_cache().get(PIN_KEY.format(user_id))
+    ):
+        pin_to_primary()
+
+
+class ReplicaRouter:
+    """Запись в основную базу, чтение безопасных запросов из реплик.
+
+    Реплики перечислены в settings.REPLICA_DATABASES. После первой записи
+    в текущем запросе чтение тоже идет в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.REPLICA_DATABASES:
+            return None
+        if _state.pinned:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        _state.written = True
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В репликах те же данные, что и в основной базе
+        return True
+
+
+class ReplicaMiddleware:
+    """Выбор базы для чтения в запросе.
+
+    После записи запросы клиента в течение REPLICA_PIN_SECONDS читают из
+    основной базы: свои изменения видны сразу, даже если реплика
+    отстает. Пользователь запоминается в общем кеше (pin_user), его
+    узнает аутентификация до чтения данных (pin_pinned_user). Кроме того,
+    клиент получает cookie: она работает для анонимных запросов и если
+    кеш потерял запись.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.pinned = (
+            request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+        )
+        _state.written = False
+        try:
+            response = self.get_response(request)
+            written = _state.written
+        finally:
+            _state.pinned = True
+            _state.written = False
+        if written:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_user(user.pk)
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 from dotenv import load_dotenv
@@ -29,7 +30,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.profiling.ProfilingMiddleware',
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api_yamdb.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,14 +64,33 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Размер пула соединений процесса, 0 - без пула
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', default=0))
+
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
+        # Пул и проверка соединений есть только у этого бэкенда
+        'ENGINE': os.getenv('DB_ENGINE', default='api_yamdb.backends.postgresql'),
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='8N3q2hVKgEsw@gUQ'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # С пулом соединение возвращается в него после каждого запроса,
+        # без пула живет CONN_MAX_AGE секунд между запросами
+        'CONN_MAX_AGE': int(os.getenv(
+            'DB_CONN_MAX_AGE', default=0 if DB_POOL_MAX_SIZE else 60
+        )),
+        'CONN_HEALTH_CHECKS': (
+            os.getenv('DB_CONN_HEALTH_CHECKS', default='True') == 'True'
+        ),
+        'POOL': {
+            'MAX_SIZE': DB_POOL_MAX_SIZE,
+            'IDLE_TIMEOUT': float(
+                os.getenv('DB_POOL_IDLE_TIMEOUT', default=300)
+            ),
+            'WAIT_TIMEOUT': float(os.getenv('DB_POOL_WAIT_TIMEOUT', default=5)),
+        },
     }
 }
 if DEBUG:
@@ -77,6 +101,123 @@ if DEBUG:
         }
     }
 
+# Реплики только для чтения: хосты PostgreSQL или файлы SQLite при DEBUG
+REPLICA_DATABASES = []
+for number, replica in enumerate(os.getenv('DB_REPLICAS', default='').split(), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        **{'NAME' if DEBUG else 'HOST': replica},
+        TEST={'MIRROR': 'default'},
+    )
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Общий для процессов gunicorn кеш: сброс записи в нем виден всем
+    # процессам. Файлы подходят для одного сервера, для нескольких -
+    # memcached
+    'shared': {
+        'BACKEND': os.getenv(
+            'SHARED_CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv(
+            'SHARED_CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'api_yamdb_cache'),
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.getenv('SHARED_CACHE_MAX_ENTRIES', default=10000)
+            ),
+        },
+    },
+    # Кеш ответов API для анонимных пользователей: locmem или filebased
+    'api': {
+        'BACKEND': os.getenv(
+            'API_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', default='api'),
+        'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', default=60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', default=1000)),
+        },
+    },
+    # Представления отдельных произведений и отзывов, ключ содержит дату
+    # изменения объекта, поэтому TIMEOUT только освобождает память
+    'fragments': {
+        'BACKEND': os.getenv(
+            'FRAGMENT_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('FRAGMENT_CACHE_LOCATION', default='fragments'),
+        'TIMEOUT': int(os.getenv('FRAGMENT_CACHE_TIMEOUT', default=3600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', default=10000)
+            ),
+        },
+    },
+}
+API_CACHE_ALIAS = 'api'
+FRAGMENT_CACHE_ALIAS = 'fragments'
+# Без DEBUG этот кеш не может быть locmem: приложение не запустится
+SHARED_CACHE_ALIAS = 'shared'
+# Данные пользователя для проверки прав: кеш сбрасывается при сохранении
+# и удалении пользователя, TIMEOUT ограничивает устаревание после
+# QuerySet.update()
+AUTH_USER_CACHE_ALIAS = SHARED_CACHE_ALIAS
+AUTH_USER_CACHE_TIMEOUT = int(
+    os.getenv('AUTH_USER_CACHE_TIMEOUT', default=60)
+)
+# Слаги жанров и категорий в памяти процесса: сбрасываются по версии
+# модели в кеше API, TIMEOUT ограничивает устаревание, если кеш не общий
+SLUG_RESOLVER_TIMEOUT = float(
+    os.getenv('SLUG_RESOLVER_TIMEOUT', default=60)
+)
+
+# Заголовок Server-Timing с временем SQL, сериализации и всего запроса
+SERVER_TIMING = os.getenv('SERVER_TIMING', default='False') == 'True'
+# Каталог для гистограмм процессов gunicorn, без него /metrics
+# показывает только процесс, обработавший запрос
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(
+    os.getenv('METRICS_FLUSH_INTERVAL', default=1)
+)
+
+# Сжатие ответов gzip и brotli: порог в байтах, уровни сжатия и типы
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', default=1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', default=4))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.getenv('COMPRESSION_BROTLI_QUALITY', default=4)
+)
+COMPRESSION_CONTENT_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/msgpack',
+    'application/xml',
+    'application/javascript',
+    'text/',
+)
+
+# SQL-запросы дольше SLOW_QUERY_THRESHOLD секунд сохраняются с планом,
+# не больше SLOW_QUERY_PER_REQUEST самых медленных на запрос
+SLOW_QUERY_THRESHOLD = float(os.getenv('SLOW_QUERY_THRESHOLD', default=0.5))
+SLOW_QUERY_PER_REQUEST = 10
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', default=500))
+# Профилирование запроса по заголовку X-Profile с токеном администратора
+PROFILE_TOKEN_MAX_AGE = 3600
+REQUEST_PROFILE_LOG_SIZE = int(
+    os.getenv('REQUEST_PROFILE_LOG_SIZE', default=50)
+)
+REQUEST_PROFILE_STATS_LIMIT = 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,11 +242,25 @@ USE_TZ = True
 AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': (
+        'api.negotiation.AvailableContentNegotiation'
+    ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 100,
@@ -128,6 +283,39 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 EMAIL_REPLY_TO = 'yamdb.team4@gmail.com'
+# Очередь писем: отправляются командой send_emails пачками
+EMAIL_OUTBOX_BATCH_SIZE = int(
+    os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=100)
+)
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(
+    os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+)
+# Задержка перед повтором удваивается с каждой попыткой (в секундах)
+EMAIL_OUTBOX_RETRY_DELAY = int(
+    os.getenv('EMAIL_OUTBOX_RETRY_DELAY', default=60)
+)
+EMAIL_OUTBOX_MAX_RETRY_DELAY = int(
+    os.getenv('EMAIL_OUTBOX_MAX_RETRY_DELAY', default=3600)
+)
+EMAIL_OUTBOX_POLL_INTERVAL = int(
+    os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', default=5)
+)
+# Сколько секунд взятая пачка недоступна другим обработчикам: если
+# обработчик упал при отправке, письма повторятся после этого срока
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(
+    os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', default=300)
+)
+# Отправленные и исчерпавшие попытки письма удаляются через столько секунд
+EMAIL_OUTBOX_RETENTION = int(
+    os.getenv('EMAIL_OUTBOX_RETENTION', default=86400)
+)
+
+# Коды подтверждения: время жизни в секундах и число попыток ввода.
+# Если задан общий для всех процессов кеш (например, filebased), коды
+# хранятся в нем, иначе - в таблице reviews_confirmationcode
+PINCODE_TTL = int(os.getenv('PINCODE_TTL', default=900))
+PINCODE_MAX_ATTEMPTS = int(os.getenv('PINCODE_MAX_ATTEMPTS', default=3))
+PINCODE_CACHE_ALIAS = os.getenv('PINCODE_CACHE_ALIAS')
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -135,6 +323,11 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
 }
 
+# Наибольшее число произведений в пакетном запросе
+TITLE_BATCH_MAX_SIZE = 1000
+# Сколько строк читать из серверного курсора за раз при выгрузке
+EXPORT_CHUNK_SIZE = 2000
+
 SCORE_MIN = 1
 SCORE_MAX = 10
 USERNAME_LENGTH = 150
@@ -144,4 +337,5 @@ USER_LASTNAME_LENGTH = 254
 CATEGORY_GENRE_LENGTH = 256
 SLUG_LENGTH = 50
 PINCODE_LENGTH = 6
-DEFAULT_PINCODE = 'NOPIN'
+PINCODE_DIGEST_LENGTH = 64
+SUBJECT_LENGTH = 255
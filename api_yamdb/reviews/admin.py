@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, Genre, OutgoingEmail, RequestProfile,
+                     Review, SlowQuery, Title, User)
+from .search import search_titles
 
 EMPTY_VALUE = '-пусто-'
 
@@ -47,12 +49,18 @@ class GenreAdmin(admin.ModelAdmin):
 class TitleAdmin(admin.ModelAdmin):
     """Администрирование произведений"""
 
-    list_display = ('id', 'name', 'description', 'year', 'category')
+    list_display = ('id', 'name', 'description', 'year', 'category', 'rating')
     list_editable = ('category',)
+    readonly_fields = ('rating', 'rating_count')
     search_fields = ('name',)
     list_filter = ('category',)
     empty_value_display = EMPTY_VALUE
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_titles(queryset, search_term), False
+
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -70,3 +78,54 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'author', 'text', 'pub_date', 'review')
     search_fields = ('text',)
     list_filter = ('author',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Администрирование очереди писем"""
+
+    list_display = (
+        'id',
+        'to',
+        'subject',
+        'created',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    search_fields = ('to',)
+    list_filter = ('sent_at',)
+    readonly_fields = ('created', 'last_error')
+    empty_value_display = EMPTY_VALUE
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """Журнал только для просмотра"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(ReadOnlyAdmin):
+    """Журнал медленных SQL-запросов"""
+
+    list_display = ('id', 'created', 'view', 'duration', 'database', 'path')
+    list_filter = ('view', 'database')
+    search_fields = ('view', 'path', 'sql')
+    empty_value_display = EMPTY_VALUE
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(ReadOnlyAdmin):
+    """Профили запросов"""
+
+    list_display = (
+        'id', 'created', 'method', 'view', 'path', 'duration', 'requested_by'
+    )
+    list_filter = ('view',)
+    search_fields = ('view', 'path')
+    empty_value_display = EMPTY_VALUE
@@ -0,0 +1,387 @@
+import csv
+import io
+import json
+import os
+import re
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.sql import InsertQuery
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import ROLE_USER, Category, Comment, Genre, Review, Title, User
+from .ratings import rebuild_ratings
+
+CHECKPOINT_SUFFIX = '.checkpoint'
+SLUG_SEPARATOR = re.compile(r'[\s,]+')
+
+# Импорт пишет в обход сигналов сохранения: после него отправляется
+# rows_imported с sender - каждой измененной моделью
+rows_imported = Signal(providing_args=['using'])
+
+
+class ImportDataError(ValueError):
+    """Ошибка в данных импортируемого файла."""
+
+
+def read_rows(path):
+    """Построчное чтение CSV (с заголовком) или JSONL без загрузки файла."""
+    with open(path, encoding='utf-8', newline='') as file:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _copy_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def copy_objects(model, fields, objs, using):
+    """Вставка через COPY ... FROM STDIN в PostgreSQL."""
+    connection = connections[using]
+    buffer = io.StringIO()
+    for obj in objs:
+        buffer.write(','.join(
+            _copy_value(
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+            )
+            for field in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(model._meta.db_table)} ({columns}) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def insert_objects(model, fields, objs, using, ignore_conflicts=False):
+    """Многострочный INSERT без pre_save: значения уже подготовлены."""
+    connection = connections[using]
+    size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+    for start in range(0, len(objs), size):
+        query = InsertQuery(model, ignore_conflicts=ignore_conflicts)
+        query.insert_values(fields, objs[start:start + size], raw=True)
+        query.get_compiler(using=using).execute_sql()
+
+
+class Importer:
+    """Построение объектов модели из строк файла."""
+
+    model = None
+
+    def __init__(self, using):
+        self.using = using
+
+    def get_map(self, model, field):
+        return dict(
+            model.objects.using(self.using).values_list(field, 'pk')
+        )
+
+    def lookup(self, mapping, value, name):
+        try:
+            return mapping[value]
+        except KeyError:
+            raise ImportDataError(f'{name} «{value}» не найден')
+
+    def get_id(self, row, name, mapping=None):
+        """Id связанной записи: из колонки name_id или по ключу в name."""
+        if row.get(f'{name}_id') not in (None, ''):
+            return int(row[f'{name}_id'])
+        if mapping is None or row.get(name) in (None, ''):
+            raise ImportDataError(f'не указано поле {name}')
+        return self.lookup(mapping, row[name], name)
+
+    def build(self, row):
+        raise NotImplementedError
+
+    def get_related(self, row, obj):
+        """Объекты связанных таблиц (строки M2M) для строки файла."""
+        return ()
+
+    def finish(self):
+        """Пересчет производных данных после импорта."""
+
+    def get_changed_models(self):
+        """Модели, данные которых изменил импорт."""
+        return (self.model,)
+
+
+class CategoryImporter(Importer):
+    model = Category
+
+    def build(self, row):
+        return self.model(
+            id=row.get('id') or None, name=row['name'], slug=row['slug']
+        )
+
+
+class GenreImporter(CategoryImporter):
+    model = Genre
+
+
+class UserImporter(Importer):
+    model = User
+
+    def __init__(self, using):
+        super().__init__(using)
+        self.password = make_password(None)
+
+    def build(self, row):
+        return self.model(
+            id=row.get('id') or None,
+            username=row['username'],
+            email=row['email'],
+            role=row.get('role') or ROLE_USER,
+            bio=row.get('bio') or '',
+            first_name=row.get('first_name') or '',
+            last_name=row.get('last_name') or '',
+            password=self.password,
+        )
+
+
+class TitleImporter(Importer):
+    model = Title
+
+    def __init__(self, using):
+        super().__init__(using)
+        self.categories = self.get_map(Category, 'slug')
+        self.genres = self.get_map(Genre, 'slug')
+        self.through = Title.genre.through
+
+    def build(self, row):
+        has_category = row.get('category') or row.get('category_id')
+        return self.model(
+            id=row.get('id') or None,
+            name=row['name'],
+            year=int(row['year']),
+            description=row.get('description') or '',
+            category_id=(
+                self.get_id(row, 'category', self.categories)
+                if has_category else None
+            ),
+        )
+
+    def get_genres(self, row):
+        genres = row.get('genre') or ()
+        if isinstance(genres, str):
+            genres = [slug for slug in SLUG_SEPARATOR.split(genres) if slug]
+        return [self.lookup(self.genres, slug, 'genre') for slug in genres]
+
+    def get_related(self, row, obj):
+        genres = self.get_genres(row)
+        if genres and obj.pk is None:
+            raise ImportDataError('для привязки жанров нужен id')
+        return [
+            self.through(title_id=obj.pk, genre_id=genre_id)
+            for genre_id in genres
+        ]
+
+
+class ReviewImporter(Importer):
+    model = Review
+
+    def __init__(self, using):
+        super().__init__(using)
+        self.authors = self.get_map(User, 'username')
+
+    def build(self, row):
+        return self.model(
+            id=row.get('id') or None,
+            title_id=self.get_id(row, 'title'),
+            author_id=self.get_id(row, 'author', self.authors),
+            text=row['text'],
+            score=int(row['score']),
+            pub_date=row.get('pub_date') or None,
+        )
+
+    def finish(self):
+        rebuild_ratings(
+            Title.objects.using(self.using).all(),
+            Review,
+            updated=timezone.now(),
+        )
+
+    def get_changed_models(self):
+        return (self.model, Title)
+
+
+class CommentImporter(Importer):
+    model = Comment
+    touch_batch_size = 1000
+
+    def __init__(self, using):
+        super().__init__(using)
+        self.authors = self.get_map(User, 'username')
+        self.review_ids = set()
+
+    def build(self, row):
+        review_id = self.get_id(row, 'review')
+        self.review_ids.add(review_id)
+        return self.model(
+            id=row.get('id') or None,
+            review_id=review_id,
+            author_id=self.get_id(row, 'author', self.authors),
+            text=row['text'],
+            pub_date=row.get('pub_date') or None,
+        )
+
+    def finish(self):
+        # По дате изменения отзыва и произведения считаются валидаторы
+        # ответов с комментариями
+        now = timezone.now()
+        review_ids = iter(sorted(self.review_ids))
+        while True:
+            batch = list(islice(review_ids, self.touch_batch_size))
+            if not batch:
+                break
+            reviews = Review.objects.using(self.using).filter(pk__in=batch)
+            Title.objects.using(self.using).filter(
+                pk__in=reviews.values('title_id')
+            ).update(updated=now)
+            reviews.update(updated=now)
+
+    def get_changed_models(self):
+        return (self.model, Review, Title)
+
+
+IMPORTERS = {
+    'users': UserImporter,
+    'categories': CategoryImporter,
+    'genres': GenreImporter,
+    'titles': TitleImporter,
+    'reviews': ReviewImporter,
+    'comments': CommentImporter,
+}
+
+
+class BulkImport:
+    """Потоковый импорт файла пачками по batch_size строк.
+
+    Каждая пачка вставляется в своей транзакции, после нее в файл
+    path.checkpoint записывается число обработанных строк: с этого места
+    импорт продолжается при resume=True. Первая пачка после checkpoint
+    могла быть уже записана, поэтому продолжить можно только импорт
+    строк с id.
+    """
+
+    def __init__(self, kind, path, batch_size, using=DEFAULT_DB_ALIAS):
+        self.importer = IMPORTERS[kind](using)
+        self.path = path
+        self.checkpoint = f'{path}{CHECKPOINT_SUFFIX}'
+        self.batch_size = batch_size
+        self.using = using
+        self.connection = connections[using]
+        self.models = set()
+
+    def read_checkpoint(self):
+        try:
+            with open(self.checkpoint) as file:
+                return int(file.read())
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, done):
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(str(done))
+        os.replace(temporary, self.checkpoint)
+
+    def prepare(self, objs):
+        """Поля для вставки, auto_now и auto_now_add заполняются здесь."""
+        model = type(objs[0])
+        with_pk = {obj.pk is not None for obj in objs}
+        if len(with_pk) > 1:
+            raise ImportDataError('id указан не во всех строках')
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key or with_pk == {True}
+        ]
+        for obj in objs:
+            for field in fields:
+                if getattr(obj, field.attname) is None:
+                    field.pre_save(obj, True)
+        if with_pk == {True}:
+            self.models.add(model)
+        return fields
+
+    def write(self, objs, replay):
+        if not objs:
+            return
+        fields = self.prepare(objs)
+        model = type(objs[0])
+        # Пачку, прерванную до записи checkpoint, вставляем повторно
+        # без конфликтов
+        if self.connection.vendor == 'postgresql' and not replay:
+            copy_objects(model, fields, objs, self.using)
+        else:
+            insert_objects(
+                model, fields, objs, self.using, ignore_conflicts=replay
+            )
+
+    def build(self, batch):
+        """Объекты пачки и связанные с ними объекты."""
+        objs, related = [], []
+        for number, row in batch:
+            try:
+                obj = self.importer.build(row)
+                related.extend(self.importer.get_related(row, obj))
+            except KeyError as error:
+                raise ImportDataError(f'Строка {number}: нет поля {error}')
+            except (TypeError, ValueError) as error:
+                raise ImportDataError(f'Строка {number}: {error}')
+            objs.append(obj)
+        return objs, related
+
+    def reset_sequences(self):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.models)
+        )
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def run(self, resume=False, progress=None):
+        """Импорт файла, возвращает число обработанных строк."""
+        done = self.read_checkpoint() if resume else 0
+        replay = done > 0
+        rows = islice(enumerate(read_rows(self.path), 1), done, None)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic(using=self.using):
+                objs, related = self.build(batch)
+                if replay and objs[0].pk is None:
+                    # Без id вставленные строки пачки не отличить от новых
+                    raise ImportDataError(
+                        'Продолжить можно только импорт строк с id'
+                    )
+                self.write(objs, replay)
+                self.write(related, replay)
+            done += len(batch)
+            replay = False
+            self.write_checkpoint(done)
+            if progress is not None:
+                progress(done)
+        self.reset_sequences()
+        self.importer.finish()
+        for model in self.importer.get_changed_models():
+            rows_imported.send(sender=model, using=self.using)
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        return done
@@ -0,0 +1,117 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Comment, Review, Title
+
+# Поля совпадают с колонками import_data, выгрузку можно загрузить обратно
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'description', 'category', 'genre', 'rating',
+    'rating_count',
+)
+REVIEW_FIELDS = ('id', 'title_id', 'author', 'text', 'score', 'pub_date')
+COMMENT_FIELDS = (
+    'id', 'review_id', 'title_id', 'author', 'text', 'pub_date'
+)
+
+
+def _iterate(queryset):
+    # На PostgreSQL iterator() читает через серверный курсор
+    return queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def _merge(rows, related):
+    """Связанные значения для каждой строки без загрузки их в память.
+
+    rows - словари с id, related - пары (id, значение), оба потока
+    упорядочены по id.
+    """
+    related = iter(related)
+    pending = next(related, None)
+    for row in rows:
+        values = []
+        while pending is not None and pending[0] <= row['id']:
+            if pending[0] == row['id']:
+                values.append(pending[1])
+            pending = next(related, None)
+        yield row, values
+
+
+def export_titles(using=DEFAULT_DB_ALIAS):
+    titles = Title.objects.using(using).order_by('pk').values(
+        'id', 'name', 'year', 'description', 'category__slug', 'rating',
+        'rating_count',
+    )
+    genres = Title.genre.through.objects.using(using).order_by(
+        'title_id', 'genre__slug'
+    ).values_list('title_id', 'genre__slug')
+    for title, slugs in _merge(_iterate(titles), _iterate(genres)):
+        title['category'] = title.pop('category__slug')
+        title['genre'] = slugs
+        yield title
+
+
+def export_reviews(using=DEFAULT_DB_ALIAS):
+    reviews = Review.objects.using(using).order_by('pk').values(
+        'id', 'title_id', 'text', 'score', 'pub_date', 'author__username'
+    )
+    for review in _iterate(reviews):
+        review['author'] = review.pop('author__username')
+        yield review
+
+
+def export_comments(using=DEFAULT_DB_ALIAS):
+    comments = Comment.objects.using(using).order_by('pk').values(
+        'id', 'review_id', 'review__title_id', 'text', 'pub_date',
+        'author__username',
+    )
+    for comment in _iterate(comments):
+        comment['title_id'] = comment.pop('review__title_id')
+        comment['author'] = comment.pop('author__username')
+        yield comment
+
+
+EXPORTERS = {
+    'titles': (export_titles, TITLE_FIELDS),
+    'reviews': (export_reviews, REVIEW_FIELDS),
+    'comments': (export_comments, COMMENT_FIELDS),
+}
+
+
+def to_ndjson(records, fields=None):
+    for record in records:
+        yield json.dumps(
+            record, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+class _Echo:
+    """Файл для csv.writer, который возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def to_csv(records, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for record in records:
+        yield writer.writerow(
+            ','.join(value) if isinstance(value, list) else value
+            for value in (record[field] for field in fields)
+        )
+
+
+FORMATS = {
+    'ndjson': to_ndjson,
+    'csv': to_csv,
+}
+
+
+def export(resource, export_format, using=DEFAULT_DB_ALIAS):
+    """Потоковая выгрузка: генератор строк в формате ndjson или csv."""
+    exporter, fields = EXPORTERS[resource]
+    return FORMATS[export_format](exporter(using), fields)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from reviews.export import EXPORTERS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка произведений, отзывов или комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=tuple(EXPORTERS))
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=tuple(FORMATS),
+            default='ndjson',
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        lines = export(
+            options['resource'],
+            options['export_format'],
+            using=options['database'],
+        )
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+            f.writelines(lines)
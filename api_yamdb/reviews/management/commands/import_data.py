@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from reviews.bulk_import import IMPORTERS, BulkImport, ImportDataError
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковый импорт пользователей, категорий, жанров, произведений, '
+        'отзывов и комментариев из CSV или JSONL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=tuple(IMPORTERS))
+        parser.add_argument('path', help='Файл .csv или .jsonl')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько строк вставлять в одной транзакции',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванный импорт с последней пачки',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(done):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'Обработано строк: {done} '
+                f'({done / max(elapsed, 1e-6):.0f} строк/с)'
+            )
+
+        bulk_import = BulkImport(
+            options['kind'],
+            options['path'],
+            options['batch_size'],
+            using=options['database'],
+        )
+        try:
+            done = bulk_import.run(resume=options['resume'], progress=progress)
+        except (ImportDataError, FileNotFoundError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(f'Импортировано строк: {done}'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from reviews.models import Review, Title
+from reviews.ratings import rating_mismatches, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчет сохраненных рейтингов произведений по отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = rating_mismatches(Title.objects.all(), Review)
+            for title in mismatches.iterator():
+                self.stdout.write(
+                    f'Произведение {title.pk}: сохранено '
+                    f'{title.rating_sum}/{title.rating_count}, '
+                    f'по отзывам {title.actual_sum}/{title.actual_count}'
+                )
+            count = mismatches.count()
+            if count:
+                raise CommandError(f'Расхождений в рейтингах: {count}')
+            self.stdout.write(self.style.SUCCESS('Рейтинги совпадают'))
+            return
+        updated = rebuild_ratings(
+            Title.objects.all(), Review, updated=timezone.now()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+        )
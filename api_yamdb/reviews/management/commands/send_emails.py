@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.outbox import deliver_outbox, purge_outbox
+
+# Как часто в режиме --loop удалять старые письма (в секундах)
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди и удаление старых писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя очередь раз в '
+                 'EMAIL_OUTBOX_POLL_INTERVAL секунд',
+        )
+
+    def purge(self):
+        deleted = purge_outbox()
+        if deleted:
+            self.stdout.write(f'Удалено старых писем: {deleted}')
+        return time.monotonic()
+
+    def handle(self, *args, **options):
+        purged_at = self.purge()
+        while True:
+            sent, failed = deliver_outbox(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {failed}'
+                )
+            if not options['loop']:
+                return
+            if time.monotonic() - purged_at >= PURGE_INTERVAL:
+                purged_at = self.purge()
+            # Полная пачка - в очереди, скорее всего, есть еще письма
+            if sent + failed < options['batch_size']:
+                time.sleep(settings.EMAIL_OUTBOX_POLL_INTERVAL)
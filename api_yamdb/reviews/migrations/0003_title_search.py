@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from reviews.search import SEARCH_INDEX_SQL
+
+
+def create_search_index(apps, schema_editor):
+    create, _ = SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, ((), ()))
+    for sql in create:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    _, drop = SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, ((), ()))
+    for sql in drop:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('requested_by', models.CharField(max_length=150, verbose_name='Кто запросил')),
+                ('method', models.CharField(max_length=10, verbose_name='Метод')),
+                ('view', models.CharField(max_length=255, verbose_name='Представление')),
+                ('path', models.TextField(verbose_name='Адрес запроса')),
+                ('duration', models.FloatField(verbose_name='Длительность, с')),
+                ('stats', models.TextField(verbose_name='Статистика')),
+            ],
+            options={
+                'verbose_name': 'Профиль запроса',
+                'verbose_name_plural': 'Профили запросов',
+                'ordering': ('-id',),
+            },
+        ),
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('database', models.CharField(max_length=100, verbose_name='База данных')),
+                ('view', models.CharField(max_length=255, verbose_name='Представление')),
+                ('path', models.TextField(verbose_name='Адрес запроса')),
+                ('sql', models.TextField(verbose_name='SQL')),
+                ('duration', models.FloatField(verbose_name='Длительность, с')),
+                ('explain', models.TextField(blank=True, verbose_name='План запроса')),
+            ],
+            options={
+                'verbose_name': 'Медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ('-id',),
+            },
+        ),
+    ]
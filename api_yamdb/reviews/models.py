@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .validators import username_validator, year_validator
@@ -41,10 +42,6 @@ class User(AbstractUser):
         choices=ROLES,
         default=ROLE_USER,
     )
-    pincode = models.CharField(
-        max_length=settings.PINCODE_LENGTH,
-        default=settings.DEFAULT_PINCODE,
-    )
 
     @property
     def is_admin(self):
@@ -55,6 +52,27 @@ class User(AbstractUser):
         return self.role == ROLE_MODERATOR
 
 
+class ConfirmationCode(models.Model):
+    """Код подтверждения, выданный при регистрации.
+
+    Хранится только подпись кода, сам код уходит пользователю в письме.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation_code',
+    )
+    digest = models.CharField(max_length=settings.PINCODE_DIGEST_LENGTH)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('Код подтверждения')
+        verbose_name_plural = _('Коды подтверждения')
+
+
 class CategoryGenreCommon(models.Model):
     """Абстрактная модель для DRI"""
 
@@ -109,9 +127,29 @@ class Title(models.Model):
         blank=True,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        _('Сумма оценок'), default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        _('Количество оценок'), default=0, editable=False
+    )
+    rating = models.FloatField(
+        _('Рейтинг'), null=True, editable=False, db_index=True
+    )
+    updated = models.DateTimeField(
+        _('Дата изменения'), auto_now=True, db_index=True
+    )
 
     class Meta:
         ordering = ('name',)
+        # Фильтры по категории и году с сортировкой по названию
+        indexes = [
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(
+                fields=('category', 'name'), name='title_category_name_idx'
+            ),
+            models.Index(fields=('year', 'name'), name='title_year_name_idx'),
+        ]
         verbose_name = _('Произведение')
         verbose_name_plural = _('Произведения')
 
@@ -135,6 +173,7 @@ class ReviewCommentCommon(models.Model):
     pub_date = models.DateTimeField(
         _('Дата публикации'), auto_now_add=True, db_index=True
     )
+    updated = models.DateTimeField(_('Дата изменения'), auto_now=True)
 
     class Meta:
         abstract = True
@@ -169,9 +208,24 @@ class Review(ReviewCommentCommon):
                 fields=('author', 'title'), name='unique_reviews'
             )
         ]
+        # Отзывы произведения в порядке постраничного вывода по ключу
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            )
+        ]
         verbose_name = _('Отзыв')
         verbose_name_plural = _('Отзывы')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении
+        # пересчитать рейтинг произведения только на разницу
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Comment(ReviewCommentCommon):
     """Модель комментариев пользователей."""
@@ -181,5 +235,96 @@ class Comment(ReviewCommentCommon):
     )
 
     class Meta(ReviewCommentCommon.Meta):
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            )
+        ]
         verbose_name = _('Комментарий')
         verbose_name_plural = _('Комментарии')
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField(_('Тема'), max_length=settings.SUBJECT_LENGTH)
+    body = models.TextField(_('Текст'))
+    from_email = models.EmailField(
+        _('Отправитель'), max_length=settings.EMAIL_LENGTH
+    )
+    to = models.TextField(_('Получатели'))
+    created = models.DateTimeField(_('Дата создания'), auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        _('Следующая попытка'), default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField(_('Попытки'), default=0)
+    last_error = models.TextField(_('Последняя ошибка'), blank=True)
+    sent_at = models.DateTimeField(_('Дата отправки'), null=True, blank=True)
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        indexes = [
+            models.Index(
+                fields=('next_attempt_at',),
+                name='outgoing_email_pending_idx',
+                condition=models.Q(sent_at__isnull=True),
+            )
+        ]
+        verbose_name = _('Исходящее письмо')
+        verbose_name_plural = _('Исходящие письма')
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
+
+    @property
+    def recipients(self):
+        return self.to.split()
+
+
+class SlowQuery(models.Model):
+    """Медленный SQL-запрос с планом и представлением, которое его вызвало.
+
+    Хранятся последние settings.SLOW_QUERY_LOG_SIZE запросов.
+    """
+
+    created = models.DateTimeField(_('Дата'), auto_now_add=True)
+    database = models.CharField(_('База данных'), max_length=100)
+    view = models.CharField(_('Представление'), max_length=255)
+    path = models.TextField(_('Адрес запроса'))
+    sql = models.TextField(_('SQL'))
+    duration = models.FloatField(_('Длительность, с'))
+    explain = models.TextField(_('План запроса'), blank=True)
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name = _('Медленный запрос')
+        verbose_name_plural = _('Медленные запросы')
+
+    def __str__(self):
+        return f'{self.view}: {self.duration:.3f} с'
+
+
+class RequestProfile(models.Model):
+    """Профиль cProfile одного запроса.
+
+    Хранятся последние settings.REQUEST_PROFILE_LOG_SIZE профилей.
+    """
+
+    created = models.DateTimeField(_('Дата'), auto_now_add=True)
+    requested_by = models.CharField(
+        _('Кто запросил'), max_length=settings.USERNAME_LENGTH
+    )
+    method = models.CharField(_('Метод'), max_length=10)
+    view = models.CharField(_('Представление'), max_length=255)
+    path = models.TextField(_('Адрес запроса'))
+    duration = models.FloatField(_('Длительность, с'))
+    stats = models.TextField(_('Статистика'))
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name = _('Профиль запроса')
+        verbose_name_plural = _('Профили запросов')
+
+    def __str__(self):
+        return f'{self.method} {self.path}: {self.duration:.3f} с'
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+INVALID_INDEX_SQL = (
+    'SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = indexrelid '
+    'WHERE relname = %s AND NOT indisvalid'
+)
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """Создание индекса без блокировки записи в таблицу.
+
+    В PostgreSQL индекс строится через CREATE INDEX CONCURRENTLY, поэтому
+    миграция с этой операцией должна быть неатомарной (atomic = False).
+    На остальных СУБД работает как обычный AddIndex.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        quote = schema_editor.quote_name
+        # Прерванная сборка оставляет невалидный индекс, IF NOT EXISTS
+        # его пропустит, поэтому удаляем его и строим заново
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(INVALID_INDEX_SQL, (self.index.name,))
+            if cursor.fetchone():
+                schema_editor.execute(
+                    f'DROP INDEX CONCURRENTLY {quote(self.index.name)}'
+                )
+        sql = str(self.index.create_sql(model, schema_editor))
+        schema_editor.execute(sql.replace(
+            'CREATE INDEX', 'CREATE INDEX CONCURRENTLY IF NOT EXISTS', 1
+        ))
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute(
+                'DROP INDEX CONCURRENTLY IF EXISTS '
+                f'{schema_editor.quote_name(self.index.name)}'
+            )
+
+    def describe(self):
+        return (
+            f'Concurrently create index {self.index.name} on field(s) '
+            f'{", ".join(self.index.fields)} of model {self.model_name}'
+        )
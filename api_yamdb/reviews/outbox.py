@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, body, from_email, recipients):
+    """Постановка письма в очередь вместо отправки в запросе."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        to='\n'.join(recipients),
+    )
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def _fail(email, error, now):
+    email.last_error = repr(error)
+    email.next_attempt_at = now + get_retry_delay(email.attempts)
+
+
+def claim_batch(batch_size, max_attempts, now):
+    """Пачка писем, которую другие обработчики не возьмут до ее отправки.
+
+    Блокировка строк держится только на время короткой транзакции, а
+    отложенная next_attempt_at скрывает пачку от других обработчиков.
+    Попытка засчитывается при захвате: письмо, на котором обработчик
+    падает, не будет отправляться бесконечно.
+    """
+    with transaction.atomic():
+        # skip_locked позволяет нескольким обработчикам брать разные пачки
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=now,
+                attempts__lt=max_attempts,
+            )
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=now
+            + timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT),
+        )
+    for email in batch:
+        email.attempts += 1
+    return batch
+
+
+def deliver_outbox(batch_size=None, max_attempts=None):
+    """Отправка одной пачки писем через одно соединение с сервером.
+
+    Письма отправляются вне транзакции. У отправленного письма текст с
+    кодом подтверждения стирается. Возвращает количество отправленных и
+    неотправленных писем.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    now = timezone.now()
+    batch = claim_batch(batch_size, max_attempts, now)
+    if not batch:
+        return 0, 0
+    sent, handled = 0, set()
+    try:
+        with get_connection() as connection:
+            for email in batch:
+                try:
+                    EmailMessage(
+                        email.subject,
+                        email.body,
+                        email.from_email,
+                        email.recipients,
+                        connection=connection,
+                    ).send()
+                except Exception as error:
+                    _fail(email, error, now)
+                else:
+                    email.sent_at = timezone.now()
+                    email.body = ''
+                    sent += 1
+                handled.add(email.pk)
+    except Exception as error:
+        # Не удалось соединиться с сервером: вся пачка уходит на повтор
+        for email in batch:
+            if email.pk not in handled:
+                _fail(email, error, now)
+    OutgoingEmail.objects.bulk_update(
+        batch,
+        ('sent_at', 'body', 'last_error', 'next_attempt_at'),
+    )
+    return sent, len(batch) - sent
+
+
+def purge_outbox(max_attempts=None):
+    """Удаление отправленных и исчерпавших попытки писем старше
+    EMAIL_OUTBOX_RETENTION секунд. Возвращает число удаленных писем.
+    """
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    border = timezone.now() - timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETENTION
+    )
+    deleted, _ = OutgoingEmail.objects.filter(
+        Q(sent_at__lt=border)
+        | Q(sent_at__isnull=True, attempts__gte=max_attempts,
+            created__lt=border)
+    ).delete()
+    return deleted
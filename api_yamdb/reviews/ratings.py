@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import (Case, Count, F, FloatField, OuterRef, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+
+def _rating(rating_sum, rating_count, empty_count=0):
+    """Выражение для среднего рейтинга; NULL, если оценок нет."""
+    return Case(
+        When(rating_count=empty_count, then=Value(None)),
+        default=Cast(rating_sum, FloatField()) / rating_count,
+        output_field=FloatField(),
+    )
+
+
+def apply_rating_delta(titles, score_delta, count_delta):
+    """Атомарное изменение суммы и количества оценок одним UPDATE."""
+    return titles.update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+        # В UPDATE правая часть видит старые значения столбцов,
+        # поэтому рейтинг считаем по уже измененным сумме и количеству
+        rating=_rating(
+            F('rating_sum') + score_delta,
+            F('rating_count') + count_delta,
+            empty_count=-count_delta,
+        ),
+        updated=timezone.now(),
+    )
+
+
+def _actual_totals(review_model):
+    scores = (
+        review_model.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    return {
+        'actual_sum': Coalesce(
+            Subquery(scores.annotate(total=Sum('score')).values('total')), 0
+        ),
+        'actual_count': Coalesce(
+            Subquery(scores.annotate(total=Count('pk')).values('total')), 0
+        ),
+    }
+
+
+def rating_mismatches(titles, review_model):
+    """Произведения, у которых сохраненный рейтинг расходится с отзывами."""
+    return titles.annotate(**_actual_totals(review_model)).exclude(
+        rating_sum=F('actual_sum'), rating_count=F('actual_count')
+    )
+
+
+def rebuild_ratings(titles, review_model, **changes):
+    """Полный пересчет рейтингов произведений по таблице отзывов.
+
+    В changes можно передать дополнительные поля для обновления.
+    """
+    totals = _actual_totals(review_model)
+    with transaction.atomic(using=titles.db):
+        titles.update(
+            rating_sum=totals['actual_sum'],
+            rating_count=totals['actual_count'],
+        )
+        return titles.update(
+            rating=_rating(F('rating_sum'), F('rating_count')), **changes
+        )
@@ -0,0 +1,137 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+TITLE_TABLE = 'reviews_title'
+TITLE_FTS_TABLE = 'reviews_title_fts'
+SEARCH_CONFIG = 'russian'
+# Выражение должно совпадать с выражением GIN-индекса из миграции,
+# иначе PostgreSQL не сможет использовать индекс
+PG_DOCUMENT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+    f"coalesce({TITLE_TABLE}.name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+    f"coalesce({TITLE_TABLE}.description, '')), 'B')"
+)
+PG_QUERY = f"websearch_to_tsquery('{SEARCH_CONFIG}'::regconfig, %s)"
+
+PG_SEARCH_INDEX_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX reviews_title_search_idx ON {TITLE_TABLE} '
+    f'USING gin (({PG_DOCUMENT}))',
+    f'CREATE INDEX reviews_title_name_trgm_idx ON {TITLE_TABLE} '
+    f'USING gin (name gin_trgm_ops)',
+)
+PG_DROP_SEARCH_INDEX_SQL = (
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+)
+SQLITE_SEARCH_INDEX_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5("
+    f"name, description, content='{TITLE_TABLE}', content_rowid='id', "
+    f"tokenize='unicode61')",
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ai '
+    f'AFTER INSERT ON {TITLE_TABLE} '
+    f'BEGIN INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ad '
+    f'AFTER DELETE ON {TITLE_TABLE} '
+    f'BEGIN INSERT INTO {TITLE_FTS_TABLE}'
+    f'({TITLE_FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_au '
+    f'AFTER UPDATE OF name, description ON {TITLE_TABLE} '
+    f'BEGIN INSERT INTO {TITLE_FTS_TABLE}'
+    f'({TITLE_FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_DROP_SEARCH_INDEX_SQL = (
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}',
+)
+SEARCH_INDEX_SQL = {
+    'postgresql': (PG_SEARCH_INDEX_SQL, PG_DROP_SEARCH_INDEX_SQL),
+    'sqlite': (SQLITE_SEARCH_INDEX_SQL, SQLITE_DROP_SEARCH_INDEX_SQL),
+}
+WORD = re.compile(r'\w+')
+
+
+def restore_sqlite_search_index(connection):
+    """Восстановление таблицы FTS5 и триггеров в SQLite.
+
+    При изменении схемы SQLite пересоздает таблицу произведений и
+    удаляет ее триггеры, поэтому после миграций их нужно вернуть.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    if TITLE_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in SQLITE_SEARCH_INDEX_SQL:
+            cursor.execute(sql)
+
+
+def _escape_like(value):
+    return re.sub(r'([\\%_])', r'\\\1', value)
+
+
+def _search_postgresql(queryset, query):
+    return queryset.extra(
+        select={
+            'search_rank': (
+                f'ts_rank(({PG_DOCUMENT}), {PG_QUERY}) '
+                f'+ similarity({TITLE_TABLE}.name, %s)'
+            )
+        },
+        select_params=(query, query),
+        where=[f'(({PG_DOCUMENT}) @@ {PG_QUERY} '
+               f'OR {TITLE_TABLE}.name ILIKE %s)'],
+        params=(query, f'%{_escape_like(query)}%'),
+    )
+
+
+def _search_sqlite(queryset, query):
+    # Каждое слово ищем как префикс, кавычки отключают синтаксис FTS5
+    match = ' '.join(f'"{word}"*' for word in WORD.findall(query))
+    if not match:
+        return queryset.none()
+    return queryset.extra(
+        select={
+            'search_rank': (
+                f'SELECT -bm25({TITLE_FTS_TABLE}, 10.0, 1.0) '
+                f'FROM {TITLE_FTS_TABLE} WHERE {TITLE_FTS_TABLE} MATCH %s '
+                f'AND rowid = {TITLE_TABLE}.id'
+            )
+        },
+        select_params=(match,),
+        where=[f'{TITLE_TABLE}.id IN (SELECT rowid FROM {TITLE_FTS_TABLE} '
+               f'WHERE {TITLE_FTS_TABLE} MATCH %s)'],
+        params=(match,),
+    )
+
+
+def _search_fallback(queryset, query):
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).extra(select={'search_rank': '0'})
+
+
+SEARCH_BACKENDS = {
+    'postgresql': _search_postgresql,
+    'sqlite': _search_sqlite,
+}
+
+
+def search_titles(queryset, query):
+    """Полнотекстовый поиск произведений по названию и описанию.
+
+    Добавляет к выборке поле search_rank: чем больше, тем релевантнее.
+    """
+    vendor = connections[queryset.db].vendor
+    return SEARCH_BACKENDS.get(vendor, _search_fallback)(queryset, query)
@@ -0,0 +1,125 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title, User
+from .ratings import apply_rating_delta
+from .search import restore_sqlite_search_index
+
+
+def _remember_rating_values(review):
+    review._loaded_values = {
+        'title_id': review.title_id,
+        'score': review.score,
+    }
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Пересчет рейтинга произведения при создании и изменении отзыва."""
+    if raw:
+        # loaddata сохраняет рейтинг из фикстуры как есть,
+        # после загрузки его нужно пересчитать командой rebuild_ratings
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    old_title_id = loaded.get('title_id', instance.title_id)
+    old_score = loaded.get('score', instance.score)
+    if created:
+        apply_rating_delta(
+            Title.objects.filter(pk=instance.title_id), instance.score, 1
+        )
+    elif old_title_id != instance.title_id:
+        apply_rating_delta(
+            Title.objects.filter(pk=old_title_id), -old_score, -1
+        )
+        apply_rating_delta(
+            Title.objects.filter(pk=instance.title_id), instance.score, 1
+        )
+    elif old_score != instance.score:
+        apply_rating_delta(
+            Title.objects.filter(pk=instance.title_id),
+            instance.score - old_score,
+            0,
+        )
+    else:
+        # Отзывы входят в версию произведения, даже если оценка та же
+        Title.objects.filter(pk=instance.title_id).update(
+            updated=timezone.now()
+        )
+    _remember_rating_values(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Пересчет рейтинга произведения при удалении отзыва."""
+    loaded = getattr(instance, '_loaded_values', {})
+    apply_rating_delta(
+        Title.objects.filter(pk=loaded.get('title_id', instance.title_id)),
+        -loaded.get('score', instance.score),
+        -1,
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_titles_on_genre_change(sender, instance, action, reverse,
+                                 pk_set, **kwargs):
+    """Жанры входят в представление произведения, обновляем его дату."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        Title.objects.filter(pk=instance.pk).update(updated=timezone.now())
+    elif pk_set:
+        Title.objects.filter(pk__in=pk_set).update(updated=timezone.now())
+    else:
+        instance.titles.update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def touch_titles_on_genre_category_change(sender, instance, **kwargs):
+    """Переименование или удаление жанра и категории меняет произведения."""
+    if not kwargs.get('created'):
+        instance.titles.update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review_on_comment_change(sender, instance, **kwargs):
+    """Комментарии входят в версию отзыва."""
+    Review.objects.filter(pk=instance.review_id).update(updated=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def touch_on_username_change(sender, instance, raw=False,
+                             update_fields=None, **kwargs):
+    """Имя автора входит в представления отзывов и комментариев.
+
+    Обновляются и даты родителей, по которым считаются валидаторы
+    списков: произведений с отзывами автора и отзывов с его
+    комментариями.
+    """
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if not User.objects.filter(pk=instance.pk).exclude(
+        username=instance.username
+    ).exists():
+        return
+    now = timezone.now()
+    Title.objects.filter(reviews__author_id=instance.pk).update(updated=now)
+    Review.objects.filter(
+        Q(author_id=instance.pk) | Q(comments__author_id=instance.pk)
+    ).update(updated=now)
+    Comment.objects.filter(author_id=instance.pk).update(updated=now)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    if sender.name == 'reviews':
+        restore_sqlite_search_index(connections[using])
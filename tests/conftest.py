@@ -1,9 +1,43 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    # В CI нет сервера PostgreSQL, поэтому тесты с базой данных
+    # запускаются на SQLite в памяти
+    from django.conf import settings
+    from django.db import connections
+
+    default = dict(
+        settings.DATABASES['default'],
+        ENGINE='django.db.backends.sqlite3',
+        NAME=':memory:',
+    )
+    # Отдельная база вместо реплики: в нее попадает только то, что тест
+    # скопирует сам, как в отстающую реплику
+    settings.DATABASES = {'default': default, 'replica': dict(default)}
+    # Django успевает создать обертку соединения при инициализации,
+    # сбрасываем ее, чтобы она пересоздалась уже с SQLite
+    connections.__init__(settings.DATABASES)
+    connections.__dict__.pop('databases', None)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Версии и ответы в кеше переживают откат транзакции теста
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
@@ -0,0 +1,77 @@
+import pytest
+
+CATALOGUE_SIZE = 5
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='AnotherUser', email='anotheruser@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+
+    return [
+        Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(3)
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+
+    title = Title.objects.create(
+        name='Произведение', description='Описание', year=2000,
+        category=category,
+    )
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def catalogue(category, genres, django_user_model):
+    """Несколько произведений с отзывами и комментариями."""
+    from reviews.models import Comment, Review, Title
+
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{index}', email=f'author{index}@yamdb.fake'
+        )
+        for index in range(CATALOGUE_SIZE)
+    ]
+    titles = []
+    for index in range(CATALOGUE_SIZE):
+        title = Title.objects.create(
+            name=f'Произведение {index}', year=2000 + index, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=index + 1
+        )
+        for index, author in enumerate(authors)
+    ]
+    for author in authors:
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий'
+        )
+    return titles
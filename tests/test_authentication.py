@@ -0,0 +1,95 @@
+import pytest
+from api.apps import check_shared_cache
+from api.authentication import USER_KEY
+from django.core.cache import CacheHandler
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+USERS_URL = '/api/v1/users/'
+USER_TABLE = 'reviews_user'
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if f'FROM "{USER_TABLE}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+
+    def test_user_is_not_loaded_on_every_request(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        response, queries = user_queries(user_client, url)
+        assert response.status_code == 200
+        assert len(queries) == 1
+        response, queries = user_queries(user_client, url)
+        assert response.status_code == 200
+        assert not queries, (
+            'Проверьте, что повторный запрос с токеном не загружает '
+            'пользователя из БД'
+        )
+
+    def test_role_change_is_applied(self, admin, admin_client):
+        assert admin_client.get(USERS_URL).status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert admin_client.get(USERS_URL).status_code == 403, (
+            'Проверьте, что смена роли сбрасывает кеш пользователя'
+        )
+
+    def test_deleted_user_is_rejected(self, user, user_client):
+        assert user_client.get(f'{USERS_URL}me/').status_code == 200
+        user.delete()
+        assert user_client.get(f'{USERS_URL}me/').status_code == 401
+
+    def test_inactive_user_is_rejected(self, user, user_client):
+        assert user_client.get(f'{USERS_URL}me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get(f'{USERS_URL}me/').status_code == 401
+
+    def test_me_returns_full_profile(self, user, user_client):
+        user.bio = 'Биография'
+        user.save()
+        user_client.get(f'{USERS_URL}me/')
+        response = user_client.patch(
+            f'{USERS_URL}me/', data={'first_name': 'Имя'}, format='json'
+        )
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'Биография'
+        assert response.json()['email'] == user.email
+        user.refresh_from_db()
+        assert user.first_name == 'Имя'
+        assert user.bio == 'Биография'
+
+    def test_invalidation_is_shared(self, user, user_client, settings):
+        user_client.get('/api/v1/users/me/')
+        # Кеш, каким его видит другой процесс gunicorn
+        shared = settings.CACHES[settings.AUTH_USER_CACHE_ALIAS]
+        other = FileBasedCache(shared['LOCATION'], {})
+        key = USER_KEY.format(user.pk)
+        assert other.get(key) is not None
+        user.delete()
+        assert other.get(key) is None, (
+            'Проверьте, что удаление пользователя сбрасывает кеш во всех '
+            'процессах'
+        )
+
+
+class TestSharedCacheCheck:
+
+    def test_locmem_without_debug(self, settings, monkeypatch):
+        settings.CACHES = dict(settings.CACHES, shared={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        })
+        monkeypatch.setattr('api.apps.caches', CacheHandler())
+        with pytest.raises(ImproperlyConfigured):
+            check_shared_cache()
+        settings.DEBUG = True
+        check_shared_cache()
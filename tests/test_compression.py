@@ -0,0 +1,135 @@
+import gzip
+import io
+
+import brotli
+import pytest
+from api_yamdb import compression
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def small_threshold(settings):
+    settings.COMPRESSION_MIN_SIZE = 100
+
+
+@pytest.mark.parametrize('header, expected', (
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('*', 'br'),
+    ('identity', None),
+    ('', None),
+    ('GZIP;q=0.8, br;q=invalid', 'gzip'),
+))
+def test_choose_encoding(header, expected):
+    assert compression.choose_encoding(
+        header, compression.get_compressors()
+    ) == expected
+
+
+def make_middleware(response):
+    return compression.CompressionMiddleware(lambda request: response)
+
+
+@pytest.mark.django_db
+class TestCompression:
+
+    @pytest.mark.parametrize('encoding, decompress', (
+        ('gzip', gzip.decompress),
+        ('br', brotli.decompress),
+    ))
+    def test_titles(self, anon_client, catalogue, small_threshold,
+                    encoding, decompress):
+        plain = anon_client.get(TITLES_URL)
+        assert not plain.has_header('Content-Encoding')
+        response = anon_client.get(
+            TITLES_URL, HTTP_ACCEPT_ENCODING=encoding
+        )
+        assert response['Content-Encoding'] == encoding
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content)
+        assert decompress(response.content) == plain.content
+        assert response['ETag'] == plain['ETag']
+
+    def test_not_modified(self, anon_client, catalogue, small_threshold):
+        response = anon_client.get(TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['ETag'].startswith('W/')
+        response = anon_client.get(
+            TITLES_URL,
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert response.status_code == 304
+
+    def test_threshold(self, settings, anon_client, catalogue):
+        settings.COMPRESSION_MIN_SIZE = 10 ** 6
+        response = anon_client.get(TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding')
+        assert not response.has_header('Vary') or (
+            'Accept-Encoding' not in response['Vary']
+        )
+
+    def test_level(self, settings, rf):
+        content = b'{"text": "%s"}' % (b'yamdb ' * 1000)
+        sizes = []
+        for level in (1, 9):
+            settings.COMPRESSION_GZIP_LEVEL = level
+            response = make_middleware(HttpResponse(
+                content, content_type='application/json'
+            ))(rf.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+            assert gzip.decompress(response.content) == content
+            sizes.append(len(response.content))
+        assert sizes[1] < sizes[0]
+
+    def test_without_brotli(self, monkeypatch, anon_client, catalogue,
+                            small_threshold):
+        monkeypatch.setattr(compression, 'brotli', None)
+        response = anon_client.get(TITLES_URL, HTTP_ACCEPT_ENCODING='br, gzip')
+        assert response['Content-Encoding'] == 'gzip'
+
+    def test_streaming_export(self, admin_client, catalogue):
+        url = '/api/v1/export/titles/'
+        plain = b''.join(admin_client.get(url).streaming_content)
+        response = admin_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.streaming
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(b''.join(response.streaming_content)) == plain
+
+    @pytest.mark.parametrize('headers, content_type', (
+        ({'Content-Encoding': 'gzip'}, 'application/json'),
+        ({'Cache-Control': 'no-transform'}, 'application/json'),
+        ({}, 'image/png'),
+    ))
+    def test_skipped(self, rf, headers, content_type):
+        response = HttpResponse(b'0' * 5000, content_type=content_type)
+        for name, value in headers.items():
+            response[name] = value
+        response = make_middleware(response)(
+            rf.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        )
+        assert response.content == b'0' * 5000
+
+    def test_strong_etag_weakened(self, rf):
+        response = StreamingHttpResponse(
+            iter([b'0' * 100] * 50), content_type='text/csv'
+        )
+        response['ETag'] = '"strong"'
+        response = make_middleware(response)(
+            rf.get('/', HTTP_ACCEPT_ENCODING='br')
+        )
+        assert response['ETag'] == 'W/"strong"'
+        assert brotli.decompress(
+            b''.join(response.streaming_content)
+        ) == b'0' * 5000
+
+
+def test_benchmark_command():
+    output = io.StringIO()
+    call_command(
+        'benchmark_compression', items=5, repeat=1, stdout=output
+    )
+    assert 'gzip 1' in output.getvalue()
+    assert 'brotli 4' in output.getvalue()
@@ -0,0 +1,134 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def assert_not_modified(self, client, url, max_queries=1):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag'
+        )
+        with CaptureQueriesContext(connection) as context:
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == 304, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным ETag '
+            'возвращает статус 304'
+        )
+        assert not not_modified.content
+        assert len(context.captured_queries) <= max_queries
+        return response
+
+    def assert_modified(self, client, url, response):
+        fresh = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert fresh.status_code == 200, (
+            f'Проверьте, что после изменения данных GET-запрос к `{url}` '
+            'возвращает новый ответ'
+        )
+        assert fresh['ETag'] != response['ETag']
+
+    def test_title(self, anon_client, user_client, admin_client, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = self.assert_not_modified(anon_client, url)
+        assert response.has_header('Last-Modified')
+        user_client.post(f'{url}reviews/', data={'text': 'Отзыв', 'score': 3})
+        self.assert_modified(anon_client, url, response)
+
+        response = self.assert_not_modified(anon_client, url)
+        admin_client.patch(
+            f'/api/v1/genres/{title.genre.first().slug}/', data={}
+        )
+        title.category.name = 'Кино'
+        title.category.save()
+        self.assert_modified(anon_client, url, response)
+
+    def test_titles_list_from_cache(self, anon_client, admin_client, title):
+        response = self.assert_not_modified(
+            anon_client, '/api/v1/titles/', max_queries=0
+        )
+        admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        self.assert_modified(anon_client, '/api/v1/titles/', response)
+
+    def test_titles_list_last_modified_after_delete(
+        self, anon_client, admin_client, monkeypatch, catalogue
+    ):
+        from api import versions
+
+        url = '/api/v1/titles/'
+        response = anon_client.get(url)
+        assert response.has_header('Last-Modified')
+        not_modified = anon_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert not_modified.status_code == 304
+        later = versions.time() + 10
+        monkeypatch.setattr(versions, 'time', lambda: later)
+        admin_client.delete(f'{url}{catalogue[-1].pk}/')
+        fresh = anon_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert fresh.status_code == 200, (
+            'Проверьте, что после удаления произведения Last-Modified '
+            'списка меняется'
+        )
+        assert fresh.json()['count'] == len(catalogue) - 1
+
+    def test_titles_list_validators_without_queries(
+        self, anon_client, catalogue
+    ):
+        url = '/api/v1/titles/'
+        with CaptureQueriesContext(connection) as context:
+            anon_client.get(url)
+        assert not any(
+            'MAX(' in query['sql'].upper()
+            for query in context.captured_queries
+        ), 'Проверьте, что валидаторы списка не считаются агрегатом'
+
+    def test_reviews(self, anon_client, user_client, another_user, title):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        review = Review.objects.create(
+            title=title, author=another_user, text='Отзыв', score=5
+        )
+        response = self.assert_not_modified(anon_client, url)
+        detail = self.assert_not_modified(anon_client, f'{url}{review.pk}/')
+        review.text = 'Новый текст'
+        review.save()
+        self.assert_modified(anon_client, url, response)
+        self.assert_modified(anon_client, f'{url}{review.pk}/', detail)
+
+        url = f'{url}{review.pk}/comments/'
+        response = self.assert_not_modified(anon_client, url)
+        comment = user_client.post(url, data={'text': 'Комментарий'}).json()
+        self.assert_modified(anon_client, url, response)
+        response = self.assert_not_modified(anon_client, url)
+        user_client.delete(f'{url}{comment["id"]}/')
+        self.assert_modified(anon_client, url, response)
+
+    def test_author_rename(self, anon_client, catalogue):
+        title = catalogue[0]
+        review = title.reviews.order_by('pk').last()
+        comment = title.reviews.order_by('pk').first().comments.get(
+            author=review.author
+        )
+        urls = (
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/{comment.review_id}/'
+            'comments/',
+            f'/api/v1/titles/{title.pk}/reviews/{comment.review_id}/'
+            f'comments/{comment.pk}/',
+        )
+        responses = [self.assert_not_modified(anon_client, url)
+                     for url in urls]
+        author = review.author
+        author.username = 'renamed'
+        author.save()
+        for url, response in zip(urls, responses):
+            self.assert_modified(anon_client, url, response)
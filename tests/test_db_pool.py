@@ -0,0 +1,190 @@
+import threading
+
+import pytest
+from api_yamdb.backends import pool as pool_module
+from api_yamdb.backends.pool import (ConnectionPool, PoolTimeoutError,
+                                     get_pool, get_pool_stats)
+from api_yamdb.backends.postgresql.base import DatabaseWrapper
+from django.db import connections
+from psycopg2 import extensions
+
+DATABASE_URL = '/api/v1/internal/database/'
+
+
+class FakeConnection:
+
+    def __init__(self, usable=True):
+        self.usable = usable
+        self.closed = 0
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rolled_back = False
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.rolled_back = True
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.status
+
+
+def make_pool(max_size=2, idle_timeout=300, wait_timeout=1):
+    return ConnectionPool(max_size, idle_timeout, wait_timeout)
+
+
+class TestConnectionPool:
+
+    def test_reuse(self):
+        pool = make_pool()
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        assert pool.acquire(FakeConnection) is connection
+        stats = pool.stats()
+        assert stats['created'] == 1
+        assert stats['acquired'] == 2
+        assert stats['in_use'] == 1
+        assert stats['idle'] == 0
+
+    def test_max_size_and_timeout(self):
+        pool = make_pool(max_size=1, wait_timeout=0.05)
+        pool.acquire(FakeConnection)
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(FakeConnection)
+        stats = pool.stats()
+        assert stats['size'] == 1
+        assert stats['timeouts'] == 1
+
+    def test_wait_for_release(self):
+        pool = make_pool(max_size=1)
+        connection = pool.acquire(FakeConnection)
+        timer = threading.Timer(0.05, pool.release, (connection,))
+        timer.start()
+        assert pool.acquire(FakeConnection) is connection
+        timer.join()
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['max_wait_time'] > 0
+
+    def test_idle_timeout(self):
+        pool = make_pool(idle_timeout=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        assert connection.closed, (
+            'Проверьте, что простаивающие соединения закрываются'
+        )
+        assert pool.acquire(FakeConnection) is not connection
+        assert pool.stats()['closed'] == 1
+
+    def test_check_discards_broken(self):
+        pool = make_pool()
+        broken = pool.acquire(lambda: FakeConnection(usable=False))
+        pool.release(broken)
+        connection = pool.acquire(
+            FakeConnection, check=lambda connection: connection.usable
+        )
+        assert connection is not broken
+        assert broken.closed
+        assert pool.stats()['size'] == 1
+
+    def test_failed_connect_frees_slot(self):
+        pool = make_pool(max_size=1)
+
+        def connect():
+            raise OSError
+
+        with pytest.raises(OSError):
+            pool.acquire(connect)
+        assert pool.stats()['in_use'] == 0
+        pool.acquire(FakeConnection)
+
+    def test_new_pool_after_fork(self, monkeypatch):
+        monkeypatch.setattr(pool_module, '_pools', {})
+        options = {'MAX_SIZE': 2}
+        pool = get_pool('default', options)
+        assert get_pool('default', options) is pool
+        monkeypatch.setattr(pool_module.os, 'getpid', lambda: -1)
+        assert get_pool_stats('default') is None
+        assert get_pool('default', options) is not pool
+
+
+def make_wrapper(**settings):
+    settings_dict = {
+        'ENGINE': 'api_yamdb.backends.postgresql',
+        'NAME': 'yamdb',
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '',
+        'OPTIONS': {},
+        'AUTOCOMMIT': True,
+        'ATOMIC_REQUESTS': False,
+        'CONN_MAX_AGE': 0,
+        'TIME_ZONE': None,
+    }
+    settings_dict.update(settings)
+    return DatabaseWrapper(settings_dict, alias='pool-test')
+
+
+class TestDatabaseWrapper:
+
+    def test_health_check(self, monkeypatch):
+        wrapper = make_wrapper(CONN_HEALTH_CHECKS=True)
+        connection = wrapper.connection = FakeConnection()
+        checks = []
+        monkeypatch.setattr(
+            'api_yamdb.backends.postgresql.base.is_usable',
+            lambda connection: checks.append(connection) or connection.usable,
+        )
+        wrapper.close_if_health_check_failed()
+        wrapper.close_if_health_check_failed()
+        assert checks == [connection], (
+            'Проверьте, что соединение проверяется один раз за запрос'
+        )
+        wrapper.health_check_done = False
+        connection.usable = False
+        wrapper.close_if_health_check_failed()
+        assert wrapper.connection is None
+        assert connection.closed
+
+    def test_close_returns_to_pool(self, monkeypatch):
+        monkeypatch.setattr(pool_module, '_pools', {})
+        wrapper = make_wrapper(POOL={'MAX_SIZE': 1})
+        pool = wrapper.get_pool()
+        connection = pool.acquire(FakeConnection)
+        connection.status = extensions.TRANSACTION_STATUS_INTRANS
+        wrapper.connection = connection
+        wrapper.close()
+        assert connection.rolled_back
+        assert not connection.closed
+        assert pool.stats()['idle'] == 1
+        assert get_pool_stats('pool-test')['in_use'] == 0
+
+
+@pytest.mark.django_db
+class TestDatabaseStats:
+
+    def test_only_admin(self, anon_client, user_client):
+        assert anon_client.get(DATABASE_URL).status_code == 401
+        assert user_client.get(DATABASE_URL).status_code == 403
+
+    def test_stats(self, admin_client):
+        response = admin_client.get(DATABASE_URL)
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data['pid'], int)
+        default = data['databases']['default']
+        assert {'conn_max_age', 'health_checks', 'pool'} <= set(default)
+
+    def test_stats_report_backend_features(self, admin_client, monkeypatch):
+        # Бэкенд SQLite не проверяет соединения, даже если это включено
+        monkeypatch.setitem(
+            connections['default'].settings_dict, 'CONN_HEALTH_CHECKS', True
+        )
+        default = admin_client.get(DATABASE_URL).json()['databases'][
+            'default'
+        ]
+        assert default['engine'] == 'django.db.backends.sqlite3'
+        assert default['health_checks'] is False
+        assert default['pool'] is None
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review, Title
+
+EXPORT_URL = '/api/v1/export/{}/'
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def export_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        content = read_stream(response)
+    return response, content, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_only_admin(self, anon_client, user_client, catalogue):
+        url = EXPORT_URL.format('titles')
+        assert anon_client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403
+
+    def test_titles_ndjson(self, admin_client, catalogue):
+        response, content, _ = export_queries(
+            admin_client, EXPORT_URL.format('titles')
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        records = [json.loads(line) for line in content.splitlines()]
+        assert [record['id'] for record in records] == sorted(
+            title.pk for title in catalogue
+        )
+        first = catalogue[0]
+        first.refresh_from_db()
+        assert records[0]['category'] == first.category.slug
+        assert records[0]['genre'] == sorted(
+            first.genre.values_list('slug', flat=True)
+        )
+        assert records[0]['rating'] == first.rating
+
+    def test_titles_csv(self, admin_client, catalogue):
+        response = admin_client.get(EXPORT_URL.format('titles'), {
+            'format': 'csv'
+        })
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert len(rows) == len(catalogue)
+        assert rows[0]['genre'] == ','.join(sorted(
+            catalogue[0].genre.values_list('slug', flat=True)
+        ))
+
+    @pytest.mark.parametrize('resource, model', (
+        ('reviews', Review), ('comments', Comment)
+    ))
+    def test_reviews_comments(self, admin_client, catalogue, resource, model):
+        _, content, _ = export_queries(
+            admin_client, EXPORT_URL.format(resource)
+        )
+        records = [json.loads(line) for line in content.splitlines()]
+        assert len(records) == model.objects.count()
+        obj = model.objects.select_related('author').get(pk=records[0]['id'])
+        assert records[0]['author'] == obj.author.username
+
+    def test_unknown_resource(self, admin_client):
+        assert admin_client.get(EXPORT_URL.format('users')).status_code == 404
+
+    def test_queries_do_not_depend_on_size(
+        self, admin_client, catalogue, settings
+    ):
+        url = EXPORT_URL.format('titles')
+        export_queries(admin_client, url)
+        _, _, full = export_queries(admin_client, url)
+        settings.EXPORT_CHUNK_SIZE = 1
+        _, _, chunked = export_queries(admin_client, url)
+        assert full == chunked, (
+            'Проверьте, что выгрузка не делает запросов на каждую запись'
+        )
+
+    def test_command_round_trip(self, tmp_path, catalogue):
+        path = tmp_path / 'titles.csv'
+        call_command('export_data', 'titles', format='csv', output=str(path))
+        titles = {
+            title.pk: set(title.genre.values_list('slug', flat=True))
+            for title in Title.objects.all()
+        }
+        Title.objects.all().delete()
+        call_command('import_data', 'titles', str(path))
+        assert {
+            title.pk: set(title.genre.values_list('slug', flat=True))
+            for title in Title.objects.all()
+        } == titles
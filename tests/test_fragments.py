@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def get_data(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context]
+
+
+def find(items, pk):
+    return next(item for item in items if item['id'] == pk)
+
+
+@pytest.mark.django_db
+class TestFragmentCache:
+
+    def test_hit_skips_genres(self, user_client, catalogue):
+        first, queries = get_data(user_client, TITLES_URL)
+        assert any('reviews_title_genre' in sql for sql in queries)
+        second, queries = get_data(user_client, TITLES_URL)
+        assert second == first
+        assert not any('reviews_title_genre' in sql for sql in queries), (
+            'Проверьте, что представления произведений берутся из кеша'
+        )
+
+    def test_only_misses_rendered(self, user_client, catalogue):
+        get_data(user_client, TITLES_URL)
+        title = catalogue[2]
+        title.name = 'Новое название'
+        title.save()
+        data, queries = get_data(user_client, TITLES_URL)
+        assert find(data['results'], title.pk)['name'] == 'Новое название'
+        genre_sql, = [sql for sql in queries if 'reviews_title_genre' in sql]
+        assert f'({title.pk})' in genre_sql.replace(' ', '')
+
+    def test_detail_shares_list_fragments(self, user_client, catalogue):
+        data, _ = get_data(user_client, TITLES_URL)
+        title = catalogue[0]
+        detail, queries = get_data(user_client, f'{TITLES_URL}{title.pk}/')
+        assert detail == find(data['results'], title.pk)
+        assert not any('reviews_title_genre' in sql for sql in queries)
+
+    def test_genre_and_category_changes(
+        self, user_client, catalogue, category, genres
+    ):
+        from reviews.models import Genre
+
+        title = catalogue[0]
+        get_data(user_client, TITLES_URL)
+        get_data(user_client, f'{TITLES_URL}{title.pk}/')
+        title.genre.remove(genres[0])
+        genres[1].name = 'Переименованный жанр'
+        genres[1].save()
+        category.name = 'Кино'
+        category.save()
+        added = Genre.objects.create(name='Аниме', slug='anime')
+        catalogue[1].genre.add(added)
+        data, _ = get_data(user_client, TITLES_URL)
+        detail, _ = get_data(user_client, f'{TITLES_URL}{title.pk}/')
+        item = find(data['results'], title.pk)
+        assert item == detail
+        assert genres[0].slug not in [genre['slug'] for genre in item['genre']]
+        assert {'name': 'Переименованный жанр', 'slug': genres[1].slug} in (
+            item['genre']
+        )
+        assert item['category'] == {'name': 'Кино', 'slug': category.slug}
+        assert 'anime' in [
+            genre['slug']
+            for genre in find(data['results'], catalogue[1].pk)['genre']
+        ]
+
+    def test_rating_changes(self, user_client, catalogue, user):
+        title = catalogue[1]
+        data, _ = get_data(user_client, TITLES_URL)
+        assert find(data['results'], title.pk)['rating'] is None
+        response = user_client.post(
+            f'{TITLES_URL}{title.pk}/reviews/', {'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == 201
+        data, _ = get_data(user_client, TITLES_URL)
+        assert find(data['results'], title.pk)['rating'] == 7
+        detail, _ = get_data(user_client, f'{TITLES_URL}{title.pk}/')
+        assert detail['rating'] == 7
+
+    def test_review_changes(self, user_client, catalogue):
+        title = catalogue[0]
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        data, _ = get_data(user_client, url)
+        review = title.reviews.get(pk=data['results'][0]['id'])
+        detail, _ = get_data(user_client, f'{url}{review.pk}/')
+        assert detail == data['results'][0]
+        review.text = 'Исправленный отзыв'
+        review.save()
+        author = review.author
+        author.username = 'renamed'
+        author.save()
+        data, _ = get_data(user_client, url)
+        detail, _ = get_data(user_client, f'{url}{review.pk}/')
+        assert detail == find(data['results'], review.pk)
+        assert detail['text'] == 'Исправленный отзыв'
+        assert detail['author'] == 'renamed'
+
+    def test_sparse_fields_bypass_cache(self, user_client, catalogue):
+        get_data(user_client, TITLES_URL)
+        data, _ = get_data(user_client, f'{TITLES_URL}?fields=id,name')
+        assert list(data['results'][0]) == ['id', 'name']
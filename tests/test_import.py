@@ -0,0 +1,201 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+def write_csv(path, header, rows):
+    path.write_text(
+        '\n'.join([header] + rows) + '\n', encoding='utf-8'
+    )
+    return str(path)
+
+
+def write_jsonl(path, rows):
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows),
+        encoding='utf-8',
+    )
+    return str(path)
+
+
+@pytest.fixture
+def imported(tmp_path):
+    call_command('import_data', 'categories', write_csv(
+        tmp_path / 'categories.csv', 'name,slug', ['Фильм,movie']
+    ))
+    call_command('import_data', 'genres', write_csv(
+        tmp_path / 'genres.csv', 'name,slug', ['Драма,drama', 'Комедия,comedy']
+    ))
+    call_command('import_data', 'users', write_jsonl(
+        tmp_path / 'users.jsonl',
+        [
+            {'username': f'user{number}', 'email': f'user{number}@yamdb.fake'}
+            for number in range(3)
+        ],
+    ))
+    call_command('import_data', 'titles', write_csv(
+        tmp_path / 'titles.csv',
+        'id,name,year,category,genre,description',
+        [
+            '10,Первый,2000,movie,"drama,comedy","Описание, с запятой"',
+            '11,Второй,2001,movie,drama,',
+            '12,Третий,2002,,,',
+        ],
+    ))
+    call_command('import_data', 'reviews', write_jsonl(
+        tmp_path / 'reviews.jsonl',
+        [
+            {
+                'id': 100 + number, 'title_id': 10,
+                'author': f'user{number}', 'text': 'Отзыв',
+                'score': number + 5, 'pub_date': '2020-01-0{}T12:00:00Z'
+                .format(number + 1),
+            }
+            for number in range(3)
+        ],
+    ))
+    call_command('import_data', 'comments', write_jsonl(
+        tmp_path / 'comments.jsonl',
+        [{'review_id': 100, 'author': 'user1', 'text': 'Комментарий'}],
+    ))
+
+
+@pytest.mark.django_db
+class TestImportData:
+
+    def test_import(self, imported):
+        assert Category.objects.count() == 1
+        assert Genre.objects.count() == 2
+        assert User.objects.filter(username__startswith='user').count() == 3
+        assert not User.objects.get(username='user0').has_usable_password()
+        first = Title.objects.get(pk=10)
+        assert first.description == 'Описание, с запятой'
+        assert set(first.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }
+        assert Title.objects.get(pk=12).category is None
+        review = Review.objects.get(pk=100)
+        assert review.author.username == 'user0'
+        assert review.pub_date.day == 1, (
+            'Проверьте, что дата публикации берется из файла'
+        )
+        assert Comment.objects.get().review_id == 100
+        first.refresh_from_db()
+        assert first.rating_count == 3
+        assert first.rating == 6, (
+            'Проверьте, что после импорта отзывов пересчитаны рейтинги'
+        )
+
+    def test_new_rows_after_import(self, imported, user_client):
+        response = user_client.post(
+            '/api/v1/titles/11/reviews/', data={'text': 'Новый', 'score': 1}
+        )
+        assert response.status_code == 201
+        assert response.json()['id'] > 102
+
+    def test_queries_do_not_depend_on_rows(self, tmp_path, catalogue):
+        def import_titles(count, start):
+            path = write_csv(
+                tmp_path / f'titles{count}.csv',
+                'id,name,year,category,genre',
+                [
+                    f'{start + number},Фильм,2000,movie,genre-0 genre-1'
+                    for number in range(count)
+                ],
+            )
+            with CaptureQueriesContext(connection) as context:
+                call_command('import_data', 'titles', path)
+            return len(context.captured_queries)
+
+        assert import_titles(2, 1000) == import_titles(50, 2000)
+
+    def test_resume(self, tmp_path, catalogue):
+        path = write_jsonl(
+            tmp_path / 'comments.jsonl',
+            [
+                {
+                    'id': 1000 + number,
+                    'review_id': catalogue[0].reviews.first().pk,
+                    'author_id': catalogue[0].reviews.first().author_id,
+                    'text': f'Комментарий {number}',
+                }
+                for number in range(5)
+            ],
+        )
+        call_command('import_data', 'comments', path, batch_size=2)
+        assert Comment.objects.filter(pk__gte=1000).count() == 5
+        # Прерванный импорт: первая пачка вставлена, checkpoint не записан
+        Comment.objects.filter(pk__gte=1002).delete()
+        (tmp_path / 'comments.jsonl.checkpoint').write_text('1')
+        call_command(
+            'import_data', 'comments', path, batch_size=2, resume=True
+        )
+        assert Comment.objects.filter(pk__gte=1000).count() == 5
+        assert not (tmp_path / 'comments.jsonl.checkpoint').exists()
+
+    def test_resume_requires_ids(self, tmp_path, catalogue):
+        review = catalogue[0].reviews.first()
+        path = write_jsonl(
+            tmp_path / 'comments.jsonl',
+            [
+                {
+                    'review_id': review.pk,
+                    'author_id': review.author_id,
+                    'text': f'Комментарий {number}',
+                }
+                for number in range(3)
+            ],
+        )
+        (tmp_path / 'comments.jsonl.checkpoint').write_text('1')
+        count = Comment.objects.count()
+        with pytest.raises(CommandError, match='id'):
+            call_command(
+                'import_data', 'comments', path, batch_size=2, resume=True
+            )
+        assert Comment.objects.count() == count, (
+            'Проверьте, что пачка без id не вставляется повторно'
+        )
+
+    def test_response_cache_invalidated(self, tmp_path, anon_client,
+                                        category):
+        assert anon_client.get('/api/v1/titles/').json()['count'] == 0
+        call_command('import_data', 'titles', write_csv(
+            tmp_path / 'titles.csv', 'id,name,year,category',
+            ['1,Фильм,2000,movie'],
+        ))
+        assert anon_client.get('/api/v1/titles/').json()['count'] == 1, (
+            'Проверьте, что после импорта кеш ответов сбрасывается'
+        )
+
+    def test_comments_touch_reviews(self, tmp_path, anon_client,
+                                    catalogue):
+        review = catalogue[0].reviews.first()
+        url = f'/api/v1/titles/{catalogue[0].pk}/reviews/{review.pk}/comments/'
+        response = anon_client.get(url)
+        call_command('import_data', 'comments', write_jsonl(
+            tmp_path / 'comments.jsonl',
+            [{
+                'review_id': review.pk,
+                'author_id': review.author_id,
+                'text': 'Импортированный комментарий',
+            }],
+        ))
+        fresh = anon_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert fresh.status_code == 200, (
+            'Проверьте, что импорт комментариев меняет ETag их списка'
+        )
+        assert fresh['ETag'] != response['ETag']
+        assert fresh.json()['count'] == response.json()['count'] + 1
+
+    def test_unknown_slug(self, tmp_path, category):
+        path = write_csv(
+            tmp_path / 'titles.csv', 'id,name,year,category,genre',
+            ['1,Фильм,2000,movie,missing'],
+        )
+        with pytest.raises(CommandError, match='Строка 1'):
+            call_command('import_data', 'titles', path)
+        assert not Title.objects.exists()
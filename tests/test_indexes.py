@@ -0,0 +1,114 @@
+import pytest
+from api.pagination import KeysetPagination
+from django.db import connection
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+def get_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.fixture
+def dataset(django_user_model):
+    # bulk_create в SQLite не возвращает id, объекты читаются заново
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(50)
+    )
+    users = list(django_user_model.objects.order_by('pk'))
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category{i}')
+        for i in range(10)
+    )
+    categories = list(Category.objects.order_by('pk'))
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre{i}') for i in range(10)
+    )
+    genres = list(Genre.objects.order_by('pk'))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}',
+            year=1950 + i % 50,
+            category=categories[i % 10],
+        )
+        for i in range(500)
+    )
+    titles = list(Title.objects.order_by('pk'))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title=title, genre=genres[i % 10])
+        for i, title in enumerate(titles)
+    )
+    Review.objects.bulk_create(
+        Review(author=user, title=title, text='Отзыв', score=5)
+        for title in titles[:100] for user in users
+    )
+    reviews = list(Review.objects.order_by('pk')[:500])
+    Comment.objects.bulk_create(
+        Comment(author=users[i % 50], review=review, text='Комментарий')
+        for review in reviews for i in range(10)
+    )
+    # Планировщику SQLite нужна статистика, как после ANALYZE в PostgreSQL
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return titles[0], reviews[0]
+
+
+@pytest.mark.django_db
+class TestIndexes:
+
+    def test_reviews(self, dataset):
+        title, _ = dataset
+        plan = get_plan(title.reviews.order_by('-pub_date', '-id')[:10])
+        assert 'review_title_pub_date_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
+
+    @pytest.mark.parametrize('reverse', (False, True))
+    def test_reviews_after_cursor(self, dataset, reverse):
+        title, _ = dataset
+        review = title.reviews.order_by('pk')[20]
+        queryset = KeysetPagination().filter_position(
+            title.reviews.order_by('-pub_date', '-id'),
+            (review.pub_date, review.pk),
+            reverse,
+        )
+        plan = get_plan(queryset[:10])
+        # Позиция курсора ограничивает диапазон индекса, а не фильтрует
+        # все отзывы произведения
+        assert 'review_title_pub_date_idx (title_id=? AND pub_date' in plan, (
+            plan
+        )
+        assert 'TEMP B-TREE' not in plan, plan
+
+    def test_comments(self, dataset):
+        _, review = dataset
+        plan = get_plan(review.comments.order_by('-pub_date', '-id')[:10])
+        assert 'comment_review_pub_date_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
+
+    def test_titles_by_year(self, dataset):
+        plan = get_plan(Title.objects.filter(year=1960).order_by('name'))
+        assert 'title_year_name_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
+
+    def test_titles_by_category(self, dataset):
+        plan = get_plan(
+            Title.objects.filter(category__slug='category1').order_by('name')
+        )
+        assert 'title_category_name_idx' in plan, plan
+
+    def test_titles_by_genre(self, dataset):
+        plan = get_plan(
+            Title.objects.filter(genre__slug='genre1').order_by('name')
+        )
+        # Жанр хранится в связующей таблице, ее индекс по genre_id
+        # позволяет не просматривать все произведения
+        assert 'reviews_title_genre_genre_id' in plan, plan
+        assert 'SCAN reviews_title' not in plan, plan
+
+    def test_titles_ordering(self, dataset):
+        plan = get_plan(Title.objects.order_by('name'))
+        assert 'title_name_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
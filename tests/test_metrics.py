@@ -0,0 +1,106 @@
+import json
+import re
+
+import pytest
+from api_yamdb import metrics
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+TITLES_URL = '/api/v1/titles/'
+METRICS_URL = '/metrics'
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", '
+    r'serialize;dur=([\d.]+), total;dur=([\d.]+)'
+)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics, 'registry', registry)
+    return registry
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_server_timing(self, settings, anon_client, catalogue):
+        settings.SERVER_TIMING = True
+        with CaptureQueriesContext(connection) as context:
+            response = anon_client.get(TITLES_URL)
+        assert response.status_code == 200
+        match = SERVER_TIMING.fullmatch(response['Server-Timing'])
+        assert match, response['Server-Timing']
+        assert int(match[1]) == len(context.captured_queries), (
+            'Проверьте, что в Server-Timing указано число SQL-запросов'
+        )
+        assert 0 < float(match[2]) <= float(match[3])
+
+    def test_serialize_covers_rows(self, settings, anon_client,
+                                   monkeypatch, catalogue):
+        from time import sleep
+
+        from api.rows import ListRows
+
+        to_representation = ListRows.to_representation
+
+        def slow(self, *args):
+            sleep(0.05)
+            return to_representation(self, *args)
+
+        monkeypatch.setattr(ListRows, 'to_representation', slow)
+        settings.SERVER_TIMING = True
+        response = anon_client.get(TITLES_URL)
+        match = SERVER_TIMING.fullmatch(response['Server-Timing'])
+        assert float(match[2]) >= 50, (
+            'Проверьте, что в serialize входит построение данных списка'
+        )
+
+    def test_server_timing_disabled(self, anon_client):
+        response = anon_client.get(TITLES_URL)
+        assert 'Server-Timing' not in response
+
+    def test_route_histograms(self, anon_client, registry, title):
+        anon_client.get(TITLES_URL)
+        anon_client.get(TITLES_URL)
+        anon_client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        histograms = registry.snapshot()
+        total = histograms['yamdb_request_duration_seconds']
+        assert total['titles-list|GET']['count'] == 2, (
+            'Проверьте, что маршрут назван по basename роутера'
+        )
+        assert total['reviews-list|GET']['count'] == 1
+        queries = histograms['yamdb_request_db_queries']['titles-list|GET']
+        assert queries['sum'] > 0
+
+    def test_metrics_endpoint(self, anon_client, title):
+        anon_client.get(TITLES_URL)
+        response = anon_client.get(METRICS_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text
+        labels = 'route="titles-list",method="GET"'
+        assert (
+            f'yamdb_request_duration_seconds_count{{{labels}}} 1' in text
+        )
+        assert (
+            f'yamdb_request_db_queries_bucket{{{labels},le="+Inf"}} 1' in text
+        )
+
+    def test_unmatched_route(self, anon_client, registry):
+        anon_client.get('/missing/')
+        histograms = registry.snapshot()['yamdb_request_duration_seconds']
+        assert 'unmatched|GET' in histograms
+
+    def test_merge_processes(self, settings, tmp_path, anon_client,
+                             registry, title):
+        settings.METRICS_DIR = str(tmp_path)
+        anon_client.get(TITLES_URL)
+        other = registry.snapshot()
+        (tmp_path / '1.json').write_text(json.dumps(other))
+        merged = registry.collect()
+        histogram = merged['yamdb_request_duration_seconds']
+        assert histogram['titles-list|GET']['count'] == 2, (
+            'Проверьте, что /metrics складывает гистограммы всех процессов'
+        )
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
+
+
+def select_count(context, table):
+    return sum(
+        query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_review_create_loads_title_once(self, user_client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                data={'text': 'Отзыв', 'score': 5},
+            )
+        assert response.status_code == 201
+        assert select_count(context, 'reviews_title') == 1, (
+            'Проверьте, что произведение загружается один раз за запрос'
+        )
+        assert select_count(context, 'reviews_review') == 0, (
+            'Проверьте, что повторный отзыв отсекается ограничением в БД'
+        )
+
+    def test_duplicate_review(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        response = user_client.post(url, data={'text': 'Еще', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Вы не можете добавить более одного отзыва']
+        }
+        assert Review.objects.count() == 1
+        title.refresh_from_db()
+        assert title.rating_count == 1
+
+    def test_other_integrity_error(self, user, title, monkeypatch):
+        from api.serializers import ReviewSerializer
+        from django.db import IntegrityError
+        from rest_framework import serializers
+
+        def fail(self, validated_data):
+            raise IntegrityError('другое ограничение')
+
+        monkeypatch.setattr(serializers.ModelSerializer, 'create', fail)
+        with pytest.raises(IntegrityError, match='другое'):
+            ReviewSerializer().create({
+                'title': title, 'author': user, 'text': 'Отзыв', 'score': 5
+            })
+
+    def test_comment_checks_title(self, user_client, catalogue):
+        review = catalogue[0].reviews.order_by('pk').first()
+        other = catalogue[1]
+        url = f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/'
+        assert user_client.get(url).status_code == 404
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 404
+        comment = review.comments.first()
+        assert user_client.get(f'{url}{comment.pk}/').status_code == 404
+
+    def test_comment_create_loads_review_once(self, user_client, catalogue):
+        review = catalogue[0].reviews.order_by('pk').first()
+        url = (
+            f'/api/v1/titles/{catalogue[0].pk}/reviews/{review.pk}/comments/'
+        )
+        count = Comment.objects.count()
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert Comment.objects.count() == count + 1
+        assert select_count(context, 'reviews_review') == 1
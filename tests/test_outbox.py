@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import OutgoingEmail
+from reviews.outbox import enqueue_email
+
+
+class FailingEmailBackend(EmailBackend):
+    """Почтовый сервер, отклоняющий все письма."""
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CountingEmailBackend(EmailBackend):
+    """Считает, сколько раз открывалось соединение."""
+
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+class ClaimCheckingEmailBackend(EmailBackend):
+    """Запоминает, сколько писем доступно другим обработчикам."""
+
+    pending = None
+
+    def send_messages(self, messages):
+        ClaimCheckingEmailBackend.pending = OutgoingEmail.objects.filter(
+            sent_at__isnull=True, next_attempt_at__lte=timezone.now()
+        ).count()
+        return super().send_messages(messages)
+
+
+class SenderCrash(BaseException):
+    """Падение обработчика, которое не перехватывается при отправке."""
+
+
+class CrashingEmailBackend(EmailBackend):
+    """Роняет обработчик на отправке письма."""
+
+    def send_messages(self, messages):
+        raise SenderCrash
+
+
+def enqueue(count=1):
+    for number in range(count):
+        enqueue_email(
+            f'Тема {number}', 'Текст', 'from@yamdb.fake',
+            [f'user{number}@yamdb.fake'],
+        )
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_does_not_send_email(self, client):
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'new_user', 'email': 'new_user@yamdb.fake'},
+        )
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipients == ['new_user@yamdb.fake']
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new_user@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, 'Проверьте, что письмо уходит один раз'
+
+    def test_batch_uses_one_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.CountingEmailBackend'
+        CountingEmailBackend.opened = 0
+        enqueue(5)
+        call_command('send_emails', batch_size=3)
+        assert len(mail.outbox) == 3
+        assert CountingEmailBackend.opened == 1
+        call_command('send_emails', batch_size=3)
+        assert len(mail.outbox) == 5
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_failed_email_is_retried_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingEmailBackend'
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+        enqueue()
+        email = OutgoingEmail.objects.get()
+
+        delays = []
+        for _ in range(3):
+            call_command('send_emails')
+            email.refresh_from_db()
+            delays.append(email.next_attempt_at - timezone.now())
+            # Переводим часы: следующая попытка уже наступила
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert email.attempts == 3
+        assert 'SMTP недоступен' in email.last_error
+        assert delays[0] <= timedelta(seconds=60) < delays[1]
+        assert delays[1] <= timedelta(seconds=120) < delays[2]
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_emails')
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что после исчерпания попыток письмо не отправляется'
+        )
+
+    def test_crashing_email_hits_retry_cap(self, settings):
+        from reviews.outbox import deliver_outbox
+
+        settings.EMAIL_BACKEND = 'tests.test_outbox.CrashingEmailBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        enqueue()
+        for attempts in (1, 2):
+            with pytest.raises(SenderCrash):
+                deliver_outbox()
+            assert OutgoingEmail.objects.get().attempts == attempts, (
+                'Проверьте, что попытка засчитывается при захвате письма'
+            )
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert deliver_outbox() == (0, 0)
+
+    def test_file_backend(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        enqueue(2)
+        call_command('send_emails')
+        content = ''.join(path.read_text() for path in tmp_path.iterdir())
+        assert 'user0@yamdb.fake' in content
+        assert 'user1@yamdb.fake' in content
+
+    def test_sent_body_is_cleared(self):
+        enqueue()
+        call_command('send_emails')
+        assert mail.outbox[0].body == 'Текст'
+        assert OutgoingEmail.objects.get().body == '', (
+            'Проверьте, что текст с кодом не хранится после отправки'
+        )
+
+    def test_batch_is_claimed_before_sending(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.ClaimCheckingEmailBackend'
+        ClaimCheckingEmailBackend.pending = None
+        enqueue(2)
+        call_command('send_emails')
+        assert len(mail.outbox) == 2
+        assert ClaimCheckingEmailBackend.pending == 0, (
+            'Проверьте, что другой обработчик не возьмет отправляемую пачку'
+        )
+
+    def test_old_emails_are_purged(self, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+        enqueue(4)
+        sent, exhausted, recent, pending = OutgoingEmail.objects.order_by(
+            'pk'
+        )
+        old = timezone.now() - timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETENTION + 1
+        )
+        OutgoingEmail.objects.filter(pk=sent.pk).update(
+            sent_at=old, created=old
+        )
+        OutgoingEmail.objects.filter(pk=exhausted.pk).update(
+            attempts=3, created=old
+        )
+        OutgoingEmail.objects.filter(pk=recent.pk).update(
+            sent_at=timezone.now()
+        )
+        call_command('send_emails')
+        assert set(OutgoingEmail.objects.values_list('pk', flat=True)) == {
+            recent.pk, pending.pk
+        }
+        assert [email.to for email in mail.outbox] == [[pending.to]]
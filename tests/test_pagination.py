@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+REVIEWS_COUNT = 7
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    from reviews.models import Review
+
+    for index in range(REVIEWS_COUNT):
+        author = django_user_model.objects.create_user(
+            username=f'reviewer{index}', email=f'reviewer{index}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+    # Часть отзывов с одинаковой датой, чтобы проверить порядок по id
+    now = timezone.now()
+    reviews = list(Review.objects.order_by('pk'))
+    for index, review in enumerate(reviews):
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=now - timedelta(days=index // 3)
+        )
+    return list(
+        Review.objects.order_by('-pub_date', '-id').values_list('pk', flat=True)
+    )
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def walk(self, client, url, link):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что постраничный вывод по курсору не считает '
+                'общее количество записей'
+            )
+            pages.append([item['id'] for item in data['results']])
+            url = data[link]
+        return pages
+
+    def test_forward_and_backward(self, anon_client, title, reviews):
+        url = f'/api/v1/titles/{title.pk}/reviews/?cursor=&limit=3'
+        pages = self.walk(anon_client, url, 'next')
+        assert sum(pages, []) == reviews, (
+            'Проверьте, что страницы по курсору выдают все отзывы в порядке '
+            '(pub_date, id) без пропусков и повторов'
+        )
+        assert [len(page) for page in pages] == [3, 3, 1]
+
+        last = anon_client.get(url).json()
+        while last['next']:
+            last = anon_client.get(last['next']).json()
+        back = self.walk(anon_client, last['previous'], 'previous')
+        assert sum(reversed(back), []) == reviews[:6]
+
+    def test_page_cost_does_not_depend_on_depth(
+        self, anon_client, title, reviews
+    ):
+        url = f'/api/v1/titles/{title.pk}/reviews/?cursor=&limit=2'
+        queries = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                data = anon_client.get(url).json()
+            queries.append(context.captured_queries)
+            url = data['next']
+        assert len({len(page) for page in queries}) == 1
+        for page in queries:
+            assert not any(
+                'FROM "reviews_review"' in query['sql']
+                and ('COUNT(' in query['sql'] or 'OFFSET' in query['sql'])
+                for query in page
+            ), 'Проверьте, что страница по курсору не считает все отзывы'
+
+    def test_invalid_cursor(self, anon_client, title, reviews):
+        response = anon_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?cursor=broken'
+        )
+        assert response.status_code == 404
+
+    def test_limit_offset_by_default(self, anon_client, title, reviews):
+        data = anon_client.get(f'/api/v1/titles/{title.pk}/reviews/').json()
+        assert data['count'] == REVIEWS_COUNT
+        assert sorted(item['id'] for item in data['results']) == sorted(
+            reviews
+        )
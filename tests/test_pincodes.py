@@ -0,0 +1,107 @@
+import re
+from datetime import timedelta
+
+import pytest
+from api.pincodes import CachePincodeStore
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import ConfirmationCode, User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+CACHE_STORES = (None, 'default')
+
+
+def signup(client, username='new_user'):
+    response = client.post(
+        SIGNUP_URL,
+        data={'username': username, 'email': f'{username}@yamdb.fake'},
+    )
+    assert response.status_code == 200
+    call_command('send_emails')
+    return re.findall(r'\d{6}', mail.outbox[-1].body)[-1]
+
+
+def get_token(client, code, username='new_user'):
+    return client.post(
+        TOKEN_URL, data={'username': username, 'confirmation_code': code}
+    )
+
+
+@pytest.fixture(params=CACHE_STORES, ids=('db', 'cache'))
+def pincode_store(request, settings):
+    settings.PINCODE_CACHE_ALIAS = request.param
+    settings.PINCODE_MAX_ATTEMPTS = 3
+    return request.param
+
+
+@pytest.mark.django_db
+class TestPincodes:
+
+    def test_code_is_single_use(self, client, pincode_store):
+        code = signup(client)
+        response = get_token(client, code)
+        assert response.status_code == 201
+        assert 'token' in response.json()
+        assert get_token(client, code).status_code == 400, (
+            'Проверьте, что код подтверждения одноразовый'
+        )
+
+    def test_attempts_are_limited(self, client, pincode_store):
+        code = signup(client)
+        wrong = str((int(code) + 1) % 10 ** 6).zfill(6)
+        for _ in range(3):
+            assert get_token(client, wrong).status_code == 400
+        assert get_token(client, code).status_code == 400, (
+            'Проверьте, что после исчерпания попыток код не действует'
+        )
+        code = signup(client)
+        assert get_token(client, code).status_code == 201, (
+            'Проверьте, что новый код действует после повторной регистрации'
+        )
+
+    def test_code_expires(self, client, pincode_store, settings):
+        if pincode_store is None:
+            code = signup(client)
+            ConfirmationCode.objects.update(
+                expires_at=timezone.now() - timedelta(seconds=1)
+            )
+        else:
+            settings.PINCODE_TTL = -1
+            code = signup(client)
+        assert get_token(client, code).status_code == 400
+
+    def test_auth_does_not_write_users(self, client, pincode_store):
+        code = signup(client)
+        user = User.objects.get(username='new_user')
+        User.objects.filter(pk=user.pk).update(bio='не трогать')
+        get_token(client, '000000')
+        get_token(client, code)
+        assert User.objects.get(pk=user.pk).bio == 'не трогать'
+
+    def test_cache_store_falls_back_to_db(
+        self, client, settings, monkeypatch
+    ):
+        def unavailable(*args, **kwargs):
+            raise ConnectionError('Кеш недоступен')
+
+        settings.PINCODE_CACHE_ALIAS = 'default'
+        monkeypatch.setattr(CachePincodeStore, 'issue', unavailable)
+        code = signup(client)
+        assert ConfirmationCode.objects.exists()
+        assert get_token(client, code).status_code == 201
+
+    def test_cache_code_is_consumed_once(self, monkeypatch):
+        store = CachePincodeStore('default')
+        user = User(pk=1)
+        store.issue(user, 'digest')
+        # Второй запрос прочитал код до того, как первый его удалил
+        monkeypatch.setattr(store.cache, 'delete_many', lambda keys: None)
+        assert store.check(user, 'digest') is True
+        assert store.check(user, 'digest') is False, (
+            'Проверьте, что код из кеша гасится атомарно'
+        )
+        monkeypatch.undo()
+        store.issue(user, 'digest')
+        assert store.check(user, 'digest') is True
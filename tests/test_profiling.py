@@ -0,0 +1,91 @@
+import pytest
+from reviews.models import RequestProfile, SlowQuery
+
+TITLES_URL = '/api/v1/titles/'
+TOKEN_URL = '/api/v1/internal/profile-token/'
+
+
+@pytest.mark.django_db
+class TestSlowQueries:
+
+    def test_slow_queries(self, settings, anon_client, title):
+        settings.SLOW_QUERY_THRESHOLD = 0
+        response = anon_client.get(TITLES_URL, {'year': 2000})
+        assert response.status_code == 200
+        queries = SlowQuery.objects.filter(view='TitleViewSet.list')
+        assert queries.exists(), (
+            'Проверьте, что медленные запросы сохраняются с представлением'
+        )
+        query = queries.filter(sql__contains='reviews_title').first()
+        assert query.path == f'{TITLES_URL}?year=2000'
+        assert query.database == 'default'
+        assert query.explain, 'Проверьте, что сохраняется план запроса'
+        assert '?' not in query.sql and '%s' not in query.sql
+
+    def test_threshold(self, anon_client, title):
+        anon_client.get(TITLES_URL)
+        assert not SlowQuery.objects.exists()
+
+    def test_ring_buffer(self, settings, anon_client, title):
+        settings.SLOW_QUERY_THRESHOLD = 0
+        settings.SLOW_QUERY_LOG_SIZE = 3
+        for _ in range(3):
+            anon_client.get(TITLES_URL)
+        assert SlowQuery.objects.count() == 3, (
+            'Проверьте, что журнал хранит не больше SLOW_QUERY_LOG_SIZE записей'
+        )
+        last = SlowQuery.objects.order_by('pk').last().pk
+        assert set(SlowQuery.objects.values_list('pk', flat=True)) == {
+            last - 2, last - 1, last
+        }
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_token_only_admin(self, anon_client, user_client):
+        assert anon_client.post(TOKEN_URL).status_code == 401
+        assert user_client.post(TOKEN_URL).status_code == 403
+
+    def test_profile(self, admin_client, anon_client, admin, title):
+        token = admin_client.post(TOKEN_URL).json()['token']
+        response = anon_client.get(TITLES_URL, HTTP_X_PROFILE=token)
+        assert response.status_code == 200
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        assert profile.view == 'TitleViewSet.list'
+        assert profile.requested_by == admin.username
+        assert 'function calls' in profile.stats
+
+    def test_invalid_token(self, anon_client, title):
+        response = anon_client.get(TITLES_URL, HTTP_X_PROFILE='admin:forged')
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert not RequestProfile.objects.exists()
+
+    def test_token_requires_admin_role(self, admin_client, anon_client,
+                                       admin, title):
+        token = admin_client.post(TOKEN_URL).json()['token']
+        admin.role = 'user'
+        admin.save()
+        response = anon_client.get(TITLES_URL, HTTP_X_PROFILE=token)
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response, (
+            'Проверьте, что токен не действует после снятия роли '
+            'администратора'
+        )
+        assert not RequestProfile.objects.exists()
+
+    def test_admin_pages(self, client, django_user_model, settings, title):
+        settings.SLOW_QUERY_THRESHOLD = 0
+        client.get(TITLES_URL)
+        superuser = django_user_model.objects.create_superuser(
+            'root', 'root@yamdb.fake', 'password'
+        )
+        client.force_login(superuser)
+        response = client.get('/admin/reviews/slowquery/')
+        assert response.status_code == 200
+        assert 'TitleViewSet.list' in response.content.decode()
+        query = SlowQuery.objects.first()
+        response = client.get(f'/admin/reviews/slowquery/{query.pk}/change/')
+        assert response.status_code == 200
+        assert client.get('/admin/reviews/requestprofile/').status_code == 200
@@ -0,0 +1,198 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Верхние границы количества SQL-запросов для каждого адреса api/urls.py.
+# Авторизованный запрос добавляет один запрос на загрузку пользователя,
+# если его нет в кеше, условный GET к произведениям, отзывам и комментариям - запрос валидаторов.
+READ_ENDPOINTS = (
+    ('/api/v1/titles/', 'anon_client', 4),
+    ('/api/v1/titles/{title_id}/', 'anon_client', 3),
+    ('/api/v1/genres/', 'anon_client', 2),
+    ('/api/v1/categories/', 'anon_client', 2),
+    ('/api/v1/titles/{title_id}/reviews/', 'anon_client', 4),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/', 'anon_client', 3),
+    (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        'anon_client',
+        4,
+    ),
+    (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        'anon_client',
+        3,
+    ),
+    ('/api/v1/users/', 'admin_client', 3),
+    ('/api/v1/users/{username}/', 'admin_client', 2),
+    ('/api/v1/users/me/', 'user_client', 2),
+    ('/api/v1/internal/database/', 'admin_client', 1),
+)
+# Выгрузка потоковая: запросы выполняются при чтении тела ответа
+EXPORT_ENDPOINTS = (
+    ('/api/v1/export/titles/', 3),
+    ('/api/v1/export/titles/?format=csv', 3),
+    ('/api/v1/export/reviews/', 2),
+    ('/api/v1/export/reviews/?format=csv', 2),
+    ('/api/v1/export/comments/', 2),
+    ('/api/v1/export/comments/?format=csv', 2),
+)
+# Списки, количество запросов к которым не должно зависеть от размера
+# страницы
+PAGE_SIZE_INDEPENDENT = (
+    ('/api/v1/titles/', 'anon_client'),
+    ('/api/v1/genres/', 'anon_client'),
+    ('/api/v1/categories/', 'anon_client'),
+    ('/api/v1/users/', 'admin_client'),
+    ('/api/v1/titles/{title_id}/reviews/', 'anon_client'),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/', 'anon_client'),
+)
+
+
+@pytest.fixture
+def url_kwargs(catalogue, user):
+    review = catalogue[0].reviews.order_by('pk').first()
+    return {
+        'title_id': catalogue[0].pk,
+        'review_id': review.pk,
+        'comment_id': review.comments.first().pk,
+        'username': user.username,
+    }
+
+
+def count_queries(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    @pytest.mark.parametrize('url, client_name, max_queries', READ_ENDPOINTS)
+    def test_read_endpoints(
+        self, request, url_kwargs, url, client_name, max_queries
+    ):
+        client = request.getfixturevalue(client_name)
+        url = url.format(**url_kwargs)
+        response, queries = count_queries(client, 'get', url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        assert queries <= max_queries, (
+            f'GET-запрос к `{url}` выполняет {queries} SQL-запросов, '
+            f'ожидается не более {max_queries}'
+        )
+
+    @pytest.mark.parametrize('url, client_name', PAGE_SIZE_INDEPENDENT)
+    def test_list_page_size(self, request, url_kwargs, url, client_name):
+        client = request.getfixturevalue(client_name)
+        url = url.format(**url_kwargs)
+        # Пользователь попадает в кеш при первом запросе
+        client.options(url)
+        _, one_item = count_queries(client, 'get', f'{url}?limit=1')
+        _, full_page = count_queries(client, 'get', url)
+        assert one_item == full_page, (
+            f'Количество SQL-запросов к `{url}` зависит от размера страницы'
+        )
+
+    @pytest.mark.parametrize('url, max_queries', EXPORT_ENDPOINTS)
+    def test_export_endpoints(self, catalogue, admin_client, url,
+                              max_queries):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+            b''.join(response.streaming_content)
+        queries = len(context.captured_queries)
+        assert response.status_code == 200
+        assert queries <= max_queries, (
+            f'Выгрузка `{url}` выполняет {queries} SQL-запросов, '
+            f'ожидается не более {max_queries}'
+        )
+
+    def test_bulk_patch_size(self, catalogue, admin_client):
+        admin_client.options('/api/v1/titles/')
+        _, one_item = count_queries(
+            admin_client, 'patch', '/api/v1/titles/',
+            [{'id': catalogue[0].pk, 'genre': ['genre-1']}],
+        )
+        _, all_items = count_queries(
+            admin_client, 'patch', '/api/v1/titles/',
+            [{'id': title.pk, 'genre': ['genre-2']} for title in catalogue],
+        )
+        assert one_item == all_items, (
+            'Количество SQL-запросов пакетного изменения произведений '
+            'зависит от размера пакета'
+        )
+
+    def test_write_endpoints(
+        self, catalogue, url_kwargs, admin_client, user_client, anon_client
+    ):
+        title_id = catalogue[1].pk
+        review_url = '/api/v1/titles/{title_id}/reviews/{review_id}/'.format(
+            **url_kwargs
+        )
+        cases = (
+            # get_or_create (SELECT и INSERT в точке сохранения), INSERT
+            # кода подтверждения и письма в outbox
+            (
+                anon_client, 'post', '/api/v1/auth/signup/',
+                {'username': 'newbie', 'email': 'newbie@yamdb.fake'}, 200, 6,
+            ),
+            (
+                anon_client, 'post', '/api/v1/auth/token/',
+                {'username': 'newbie', 'confirmation_code': '-'}, 400, 2,
+            ),
+            (
+                admin_client, 'post', '/api/v1/genres/',
+                {'name': 'Новый жанр', 'slug': 'new-genre'}, 201, 3,
+            ),
+            (
+                admin_client, 'delete', '/api/v1/genres/new-genre/', None,
+                204, 5,
+            ),
+            (
+                admin_client, 'post', '/api/v1/titles/',
+                {
+                    'name': 'Новое произведение', 'year': 2000,
+                    'genre': ['genre-0', 'genre-1'], 'category': 'movie',
+                },
+                201, 10,
+            ),
+            (
+                admin_client, 'patch', f'/api/v1/titles/{title_id}/',
+                {'genre': ['genre-2']}, 200, 10,
+            ),
+            (
+                admin_client, 'patch', '/api/v1/titles/',
+                [
+                    {'id': title_id, 'name': 'Новое название'},
+                    {'id': catalogue[2].pk, 'genre': ['genre-2']},
+                ],
+                200, 9,
+            ),
+            (
+                admin_client, 'post', '/api/v1/internal/profile-token/',
+                None, 200, 0,
+            ),
+            (
+                user_client, 'post', f'/api/v1/titles/{title_id}/reviews/',
+                {'text': 'Отзыв', 'score': 5}, 201, 6,
+            ),
+            (
+                user_client, 'post', f'{review_url}comments/',
+                {'text': 'Комментарий'}, 201, 3,
+            ),
+            (
+                admin_client, 'patch', review_url, {'score': 3}, 200, 5,
+            ),
+        )
+        for client, method, url, data, status, max_queries in cases:
+            response, queries = count_queries(client, method, url, data)
+            assert response.status_code == status, (
+                f'Проверьте, что {method.upper()}-запрос к `{url}` '
+                f'возвращает статус {status}'
+            )
+            assert queries <= max_queries, (
+                f'{method.upper()}-запрос к `{url}` выполняет {queries} '
+                f'SQL-запросов, ожидается не более {max_queries}'
+            )
@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Avg
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def get_title(self, title):
+        from reviews.models import Title
+
+        return Title.objects.get(pk=title.pk)
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        from reviews.models import Review
+
+        assert self.get_title(title).rating is None, (
+            'Проверьте, что у произведения без отзывов рейтинг пустой'
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=4
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Отзыв', score=9
+        )
+        stored = self.get_title(title)
+        assert (stored.rating_sum, stored.rating_count) == (13, 2)
+        assert stored.rating == 6.5, (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва'
+        )
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 10
+        review.save()
+        review.save()
+        assert self.get_title(title).rating == 9.5, (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки'
+        )
+
+        review.delete()
+        assert self.get_title(title).rating == 9, (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+        )
+        Review.objects.all().delete()
+        stored = self.get_title(title)
+        assert (stored.rating_sum, stored.rating_count) == (0, 0)
+        assert stored.rating is None
+
+    def test_rating_matches_aggregate(self, title, user, another_user):
+        from reviews.models import Review, Title
+
+        for author, score in ((user, 3), (another_user, 8)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        expected = Title.objects.filter(pk=title.pk).aggregate(
+            rating=Avg('reviews__score')
+        )['rating']
+        assert self.get_title(title).rating == expected
+
+    def test_rebuild_ratings_command(self, title, user):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='Отзыв', score=7)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--verify')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--verify')
+        stored = self.get_title(title)
+        assert (stored.rating_sum, stored.rating_count) == (7, 1)
+        assert stored.rating == 7
@@ -0,0 +1,123 @@
+import datetime
+import io
+import json
+
+import msgpack
+import pytest
+from api import parsers, renderers
+from django.core.management import call_command
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+TITLES_URL = '/api/v1/titles/'
+CATEGORIES_URL = '/api/v1/categories/'
+MSGPACK = 'application/msgpack'
+
+
+def drf_json(data):
+    return JSONRenderer().render(data)
+
+
+class TestORJSONRenderer:
+
+    data = {
+        'text': 'Строка с разделителями — и тире',
+        'lazy': gettext_lazy('Произведение'),
+        'date': datetime.datetime(
+            2022, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc
+        ),
+        'day': datetime.date(2022, 1, 2),
+        1: [None, True, 1.5],
+    }
+
+    def test_same_as_drf(self):
+        assert renderers.ORJSONRenderer().render(self.data) == drf_json(
+            self.data
+        )
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.ORJSONRenderer().render(self.data) == drf_json(
+            self.data
+        )
+
+    def test_indent(self):
+        content = renderers.ORJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=2'
+        )
+        assert content == b'{\n  "a": 1\n}'
+
+    def test_parser(self, monkeypatch):
+        body = '{"name": "Фильм", "year": 2000}'.encode()
+        expected = {'name': 'Фильм', 'year': 2000}
+        assert parsers.ORJSONParser().parse(io.BytesIO(body)) == expected
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert parsers.ORJSONParser().parse(io.BytesIO(body)) == expected
+
+
+@pytest.mark.django_db
+class TestNegotiation:
+
+    def test_titles_json(self, anon_client, catalogue):
+        response = anon_client.get(TITLES_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/json'
+        assert response.content == drf_json(response.data)
+
+    def test_titles_msgpack(self, anon_client, catalogue):
+        response = anon_client.get(TITLES_URL, HTTP_ACCEPT=MSGPACK)
+        assert response.status_code == 200
+        assert response['Content-Type'] == MSGPACK
+        assert msgpack.unpackb(response.content) == json.loads(
+            drf_json(response.data)
+        )
+
+    def test_msgpack_dates(self, user_client, catalogue):
+        title = catalogue[0]
+        response = user_client.get(
+            f'{TITLES_URL}{title.pk}/reviews/', HTTP_ACCEPT=MSGPACK
+        )
+        review = msgpack.unpackb(response.content)['results'][0]
+        assert review['pub_date'] == json.loads(
+            drf_json(response.data)
+        )['results'][0]['pub_date']
+        pub_date = title.reviews.get(pk=review['id']).pub_date
+        assert review['pub_date'] == (
+            serializers.DateTimeField().to_representation(pub_date)
+        )
+
+    def test_post_msgpack(self, admin_client):
+        response = admin_client.post(
+            CATEGORIES_URL,
+            msgpack.packb({'name': 'Книга', 'slug': 'book'}),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+        assert response.status_code == 201
+        assert msgpack.unpackb(response.content) == {
+            'name': 'Книга', 'slug': 'book'
+        }
+
+    def test_post_broken_msgpack(self, admin_client):
+        response = admin_client.post(
+            CATEGORIES_URL, b'\xc1', content_type=MSGPACK
+        )
+        assert response.status_code == 400
+
+    def test_msgpack_unavailable(self, monkeypatch, anon_client):
+        monkeypatch.setattr(renderers.MessagePackRenderer, 'available', False)
+        monkeypatch.setattr(parsers.MessagePackParser, 'available', False)
+        response = anon_client.get(TITLES_URL, HTTP_ACCEPT=MSGPACK)
+        assert response.status_code == 406
+        response = anon_client.post(
+            CATEGORIES_URL, msgpack.packb({}), content_type=MSGPACK
+        )
+        assert response.status_code in (401, 415)
+
+
+def test_benchmark_command():
+    output = io.StringIO()
+    call_command('benchmark_renderers', items=5, repeat=1, stdout=output)
+    assert 'ORJSONRenderer' in output.getvalue()
+    assert 'MessagePackRenderer' in output.getvalue()
@@ -0,0 +1,131 @@
+import pytest
+from api_yamdb.replicas import PIN_COOKIE, ReplicaRouter
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Review, Title
+
+REVIEWS_URL = '/api/v1/titles/{}/reviews/'
+
+
+@pytest.fixture
+def replica(settings, user, another_user, title):
+    """Реплика с пользователями и произведением, но без отзывов."""
+    settings.REPLICA_DATABASES = ['replica']
+    user.__class__.objects.using('replica').bulk_create([user, another_user])
+    Category.objects.using('replica').bulk_create([title.category])
+    Title.objects.using('replica').bulk_create([title])
+    return 'replica'
+
+
+def get_reviews(client, title):
+    with CaptureQueriesContext(connections['replica']) as context:
+        response = client.get(REVIEWS_URL.format(title.pk))
+    assert response.status_code == 200
+    return [review['text'] for review in response.json()['results']], (
+        len(context.captured_queries)
+    )
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+class TestReplicas:
+
+    def test_reads_from_replica(self, replica, user_client, another_user,
+                                title):
+        Review.objects.create(
+            author=another_user, title=title, text='Отзыв', score=5
+        )
+        reviews, queries = get_reviews(user_client, title)
+        assert queries, 'Проверьте, что GET-запросы читают из реплики'
+        assert reviews == [], (
+            'Проверьте, что отзыв, которого нет в реплике, не виден'
+        )
+
+    def test_read_your_writes(self, replica, user_client, anon_client,
+                              title):
+        response = user_client.post(
+            REVIEWS_URL.format(title.pk),
+            {'text': 'Мой отзыв', 'score': 7},
+            format='json',
+        )
+        assert response.status_code == 201, response.json()
+        cookie = response.cookies.get(PIN_COOKIE)
+        assert cookie is not None, (
+            'Проверьте, что после записи клиент получает cookie'
+        )
+        assert int(cookie['max-age']) > 0
+        reviews, queries = get_reviews(user_client, title)
+        assert reviews == ['Мой отзыв'], (
+            'Проверьте, что после записи клиент читает из основной базы'
+        )
+        assert queries == 0
+        reviews, _ = get_reviews(anon_client, title)
+        assert reviews == []
+
+    def test_read_your_writes_without_cookies(self, replica, user_client,
+                                              anon_client, title):
+        response = user_client.post(
+            REVIEWS_URL.format(title.pk),
+            {'text': 'Мой отзыв', 'score': 7},
+            format='json',
+        )
+        assert response.status_code == 201, response.json()
+        # JWT-клиенты обычно не хранят cookie
+        user_client.cookies.clear()
+        reviews, queries = get_reviews(user_client, title)
+        assert reviews == ['Мой отзыв'], (
+            'Проверьте, что после записи пользователь читает из основной '
+            'базы и без cookie'
+        )
+        assert queries == 0
+        reviews, _ = get_reviews(anon_client, title)
+        assert reviews == []
+
+    @pytest.mark.parametrize('pin_seconds, from_primary', ((5, True), (0, False)))
+    def test_cache_fill_after_change(self, replica, anon_client, settings,
+                                     pin_seconds, from_primary):
+        settings.REPLICA_PIN_SECONDS = pin_seconds
+        anon_client.get('/api/v1/genres/')
+        Genre.objects.create(name='Новый жанр', slug='new')
+        for cache_status in ('MISS', 'HIT'):
+            response = anon_client.get('/api/v1/genres/')
+            assert response['X-Cache'] == cache_status
+            names = [genre['name'] for genre in response.json()['results']]
+            assert ('Новый жанр' in names) == from_primary, (
+                'Проверьте, что сразу после изменения промах кеша читает '
+                'из основной базы, а не из отстающей реплики'
+            )
+
+    def test_invalid_write_does_not_pin(self, replica, user_client, title):
+        response = user_client.post(
+            REVIEWS_URL.format(title.pk),
+            {'text': 'Мой отзыв', 'score': 100},
+            format='json',
+        )
+        assert response.status_code == 400
+        assert PIN_COOKIE not in response.cookies
+
+
+@pytest.mark.django_db
+class TestReplicaRouter:
+
+    def test_outside_request(self, settings):
+        settings.REPLICA_DATABASES = ['replica']
+        router = ReplicaRouter()
+        assert router.db_for_read(Review) == 'default', (
+            'Проверьте, что вне HTTP-запроса чтение идет в основную базу'
+        )
+        assert router.db_for_write(Review) == 'default'
+
+    def test_without_replicas(self, settings):
+        settings.REPLICA_DATABASES = []
+        assert ReplicaRouter().db_for_read(Review) is None
+
+    def test_write_pins_request(self, settings, monkeypatch):
+        settings.REPLICA_DATABASES = ['replica']
+        monkeypatch.setattr('api_yamdb.replicas._state.pinned', False)
+        router = ReplicaRouter()
+        assert router.db_for_read(Review) == 'replica'
+        router.db_for_write(Review)
+        assert router.db_for_read(Review) == 'default', (
+            'Проверьте, что после записи чтение идет в основную базу'
+        )
@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response, len(context.captured_queries)
+
+    @pytest.mark.parametrize(
+        'url', ('/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/')
+    )
+    def test_anonymous_response_is_cached(self, anon_client, title, url):
+        first, _ = self.get(anon_client, url)
+        second, queries = self.get(anon_client, url)
+        assert second['X-Cache'] == 'HIT'
+        assert queries == 0, (
+            f'Проверьте, что повторный запрос к `{url}` не обращается к БД'
+        )
+        assert second.json() == first.json()
+        _, queries = self.get(anon_client, f'{url}?limit=1')
+        assert queries > 0, 'Проверьте, что ключ кеша учитывает параметры'
+
+    def test_write_invalidates_cache(
+        self, anon_client, admin_client, user_client, title
+    ):
+        detail = f'/api/v1/titles/{title.pk}/'
+        self.get(anon_client, detail)
+        response = user_client.post(
+            f'{detail}reviews/', data={'text': 'Отзыв', 'score': 8}
+        )
+        assert response.status_code == 201
+        response, _ = self.get(anon_client, detail)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8
+
+        self.get(anon_client, '/api/v1/genres/')
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый жанр', 'slug': 'new'}
+        )
+        response, _ = self.get(anon_client, '/api/v1/genres/')
+        assert 'new' in [genre['slug'] for genre in response.json()['results']]
+
+        admin_client.patch(detail, data={'genre': ['new']}, format='json')
+        response, _ = self.get(anon_client, detail)
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'new'
+        ]
+
+    def test_authenticated_response_is_not_cached(
+        self, anon_client, user_client, title
+    ):
+        self.get(anon_client, '/api/v1/titles/')
+        response, queries = self.get(user_client, '/api/v1/titles/')
+        assert 'X-Cache' not in response
+        assert queries > 0
+
+    def test_file_based_cache(self, settings, tmp_path, anon_client, title):
+        settings.CACHES = dict(
+            settings.CACHES,
+            files={
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': str(tmp_path),
+            },
+        )
+        settings.API_CACHE_ALIAS = 'files'
+        self.get(anon_client, '/api/v1/titles/')
+        response, queries = self.get(anon_client, '/api/v1/titles/')
+        assert response['X-Cache'] == 'HIT'
+        assert queries == 0
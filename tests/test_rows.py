@@ -0,0 +1,77 @@
+import pytest
+from api.rows import ValuesListMixin
+from rest_framework.mixins import ListModelMixin
+
+
+@pytest.fixture
+def rows_data(catalogue, django_user_model):
+    from reviews.models import Genre, Title
+
+    # Произведение без категории и жанров, дробный рейтинг и жанры
+    # с одинаковыми названиями
+    Title.objects.create(name='Без категории', year=1999)
+    Title.objects.filter(pk=catalogue[1].pk).update(rating=7.5)
+    Title.objects.filter(pk=catalogue[2].pk).update(rating=None)
+    catalogue[3].genre.add(
+        Genre.objects.create(name='Жанр 0', slug='genre-copy')
+    )
+    return catalogue
+
+
+def get_both(monkeypatch, client, url, params=None):
+    """Ответы быстрого пути и сериализатора на один и тот же запрос."""
+    fast = client.get(url, params)
+    # Повторный ответ собирается из кеша фрагментов
+    assert client.get(url, params).content == fast.content
+    monkeypatch.setattr(ValuesListMixin, 'list', ListModelMixin.list)
+    slow = client.get(url, params)
+    monkeypatch.undo()
+    assert fast.status_code == slow.status_code == 200
+    return fast, slow
+
+
+@pytest.mark.django_db
+class TestValuesList:
+
+    @pytest.mark.parametrize('params', (
+        None,
+        {'ordering': '-rating'},
+        {'genre': 'genre-0,genre-copy'},
+        {'category': 'movie', 'limit': 2, 'offset': 1},
+        {'search': 'Произведение'},
+        {'fields': 'id,rating,genre,category'},
+        {'fields': 'genre,category', 'expand': 'category,genre'},
+    ))
+    def test_titles(self, monkeypatch, user_client, rows_data, params):
+        fast, slow = get_both(
+            monkeypatch, user_client, '/api/v1/titles/', params
+        )
+        assert fast.content == slow.content
+        assert fast.json()['results']
+
+    @pytest.mark.parametrize('params', (
+        None, {'cursor': ''}, {'fields': 'author,id'},
+    ))
+    def test_reviews(self, monkeypatch, user_client, rows_data, params):
+        fast, slow = get_both(
+            monkeypatch,
+            user_client,
+            f'/api/v1/titles/{rows_data[0].pk}/reviews/',
+            params,
+        )
+        assert fast.content == slow.content
+        assert fast.json()['results']
+
+    @pytest.mark.parametrize('params', (
+        None, {'cursor': '', 'limit': 2, 'fields': 'text'},
+    ))
+    def test_comments(self, monkeypatch, user_client, rows_data, params):
+        review = rows_data[0].reviews.order_by('pk').first()
+        fast, slow = get_both(
+            monkeypatch,
+            user_client,
+            f'/api/v1/titles/{rows_data[0].pk}/reviews/{review.pk}/comments/',
+            params,
+        )
+        assert fast.content == slow.content
+        assert fast.json()['results']
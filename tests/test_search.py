@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+
+
+@pytest.fixture
+def search_titles_data(category):
+    from reviews.models import Title
+
+    return {
+        key: Title.objects.create(
+            name=name, description=description, year=2000, category=category
+        )
+        for key, name, description in (
+            ('name', 'Властелин колец', 'Фэнтези о кольце всевластия'),
+            ('description', 'Хоббит', 'Предыстория событий Властелина колец'),
+            ('other', 'Солярис', 'Фантастика об океане'),
+        )
+    }
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def search(self, client, query, **params):
+        response = client.get(
+            '/api/v1/titles/', data={'search': query, **params}
+        )
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_search_ranks_name_matches_first(
+        self, anon_client, search_titles_data
+    ):
+        assert self.search(anon_client, 'властелин') == [
+            'Властелин колец', 'Хоббит'
+        ], (
+            'Проверьте, что поиск находит произведения по названию и '
+            'описанию и сортирует их по релевантности'
+        )
+
+    def test_search_prefix_and_syntax(self, anon_client, search_titles_data):
+        assert self.search(anon_client, 'соля') == ['Солярис']
+        assert self.search(anon_client, '"(*:') == []
+        assert self.search(anon_client, 'властелин', ordering='name') == [
+            'Властелин колец', 'Хоббит'
+        ]
+
+    def test_search_index_is_updated(self, anon_client, search_titles_data):
+        title = search_titles_data['other']
+        title.name = 'Пикник на обочине'
+        title.save()
+        assert self.search(anon_client, 'пикник') == ['Пикник на обочине']
+        assert self.search(anon_client, 'солярис') == []
+        title.delete()
+        assert self.search(anon_client, 'пикник') == []
+
+    def test_search_uses_index(self, search_titles_data):
+        from reviews.models import Title
+        from reviews.search import search_titles
+
+        queryset = search_titles(Title.objects.all(), 'властелин')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'VIRTUAL TABLE INDEX' in plan, (
+            'Проверьте, что поиск использует полнотекстовый индекс'
+        )
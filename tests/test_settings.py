@@ -6,6 +6,7 @@ class TestSettings:
     def test_settings(self):
 
         assert not settings.DEBUG, 'Проверьте, что DEBUG в настройках Django выключен'
-        assert settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', (
-            'Проверьте, что используете базу данных postgresql'
+        assert settings.DATABASES['default']['ENGINE'] == 'api_yamdb.backends.postgresql', (
+            'Проверьте, что используете базу данных postgresql с пулом и '
+            'проверкой соединений'
         )
@@ -0,0 +1,150 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+TITLES_URL = '/api/v1/titles/'
+SLUG_TABLES = ('"reviews_genre"', '"reviews_category"')
+
+
+def post_title(client, genres, category='movie'):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(TITLES_URL, {
+            'name': 'Произведение',
+            'year': 2000,
+            'category': category,
+            'genre': genres,
+        }, format='json')
+    lookups = [
+        query['sql'] for query in context.captured_queries
+        if any(f'{table}."slug" IN' in query['sql'] for table in SLUG_TABLES)
+        or any(f'{table}."slug" =' in query['sql'] for table in SLUG_TABLES)
+    ]
+    return response, lookups
+
+
+@pytest.mark.django_db
+class TestSlugResolver:
+
+    def test_one_query_per_model(self, admin_client, category, genres):
+        slugs = [genre.slug for genre in genres]
+        response, lookups = post_title(admin_client, slugs)
+        assert response.status_code == 201, response.json()
+        assert len(lookups) == 2, (
+            'Проверьте, что жанры и категория ищутся одним запросом на модель'
+        )
+        assert response.json()['genre'] == slugs
+        response, lookups = post_title(admin_client, slugs)
+        assert response.status_code == 201
+        assert not lookups, (
+            'Проверьте, что известные слаги не запрашиваются повторно'
+        )
+
+    def test_new_genre(self, admin_client, category, genres):
+        post_title(admin_client, [genres[0].slug])
+        admin_client.post(
+            '/api/v1/genres/', {'name': 'Новый', 'slug': 'new'}, format='json'
+        )
+        response, _ = post_title(admin_client, ['new'])
+        assert response.status_code == 201
+        assert response.json()['genre'] == ['new']
+
+    def test_deleted_genre(self, admin_client, category, genres):
+        post_title(admin_client, [genres[0].slug])
+        admin_client.delete(f'/api/v1/genres/{genres[0].slug}/')
+        response, _ = post_title(admin_client, [genres[0].slug])
+        assert response.status_code == 400, (
+            'Проверьте, что удаление жанра сбрасывает кеш слагов'
+        )
+        assert 'genre' in response.json()
+
+    def test_unknown_slug(self, admin_client, category, genres):
+        response, _ = post_title(admin_client, ['missing'])
+        assert response.status_code == 400
+        response, _ = post_title(
+            admin_client, [genres[0].slug], category='missing'
+        )
+        assert response.status_code == 400
+        assert 'category' in response.json()
+
+    def test_timeout(self, admin_client, category, genres, monkeypatch):
+        from reviews.models import Genre
+
+        clock = [0.0]
+        monkeypatch.setattr('api.slugs.monotonic', lambda: clock[0])
+        post_title(admin_client, [genres[0].slug])
+        # Изменение в другом процессе не меняет версию в локальном кеше
+        Genre.objects.filter(pk=genres[0].pk).update(slug='renamed')
+        response, _ = post_title(admin_client, [genres[0].slug])
+        assert response.status_code == 201
+        clock[0] += 60
+        response, _ = post_title(admin_client, [genres[0].slug])
+        assert response.status_code == 400, (
+            'Проверьте, что кеш слагов устаревает не позже '
+            'SLUG_RESOLVER_TIMEOUT'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDeletedBehindResolver:
+    """Жанр удален в другом процессе после загрузки слагов.
+
+    Внешние ключи проверяются при фиксации транзакции, поэтому тесты
+    работают без общей транзакции.
+    """
+
+    def delete_behind_resolver(self, client, model, obj, monkeypatch):
+        from api import slugs
+
+        response, _ = post_title(client, [obj.slug])
+        assert response.status_code == 201
+        # Версия в кеше этого процесса еще старая
+        version = slugs.RESOLVERS[model].version
+        monkeypatch.setattr(
+            slugs, 'get_versions', lambda models: [version]
+        )
+        model.objects.filter(pk=obj.pk).delete()
+
+    def test_create(self, admin_client, category, genres, monkeypatch):
+        from reviews.models import Genre, Title
+
+        self.delete_behind_resolver(
+            admin_client, Genre, genres[0], monkeypatch
+        )
+        count = Title.objects.count()
+        response, _ = post_title(admin_client, [genres[0].slug])
+        assert response.status_code == 400, (
+            'Проверьте, что удаленный после поиска жанр - ошибка поля'
+        )
+        assert 'genre' in response.json()
+        assert Title.objects.count() == count
+
+    def test_batch(self, admin_client, category, genres, monkeypatch):
+        from reviews.models import Genre
+
+        self.delete_behind_resolver(
+            admin_client, Genre, genres[0], monkeypatch
+        )
+        response = admin_client.post(TITLES_URL, [
+            {'name': 'Первое', 'year': 2000, 'category': 'movie',
+             'genre': [genres[1].slug]},
+            {'name': 'Второе', 'year': 2000, 'category': 'movie',
+             'genre': [genres[0].slug]},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'genre' in errors[1]
+
+    def test_batch_update(
+        self, admin_client, category, genres, title, monkeypatch
+    ):
+        from reviews.models import Genre
+
+        self.delete_behind_resolver(
+            admin_client, Genre, genres[0], monkeypatch
+        )
+        response = admin_client.patch(TITLES_URL, [
+            {'id': title.pk, 'genre': [genres[0].slug]},
+        ], format='json')
+        assert response.status_code == 400
+        assert 'genre' in response.json()[0]
@@ -0,0 +1,110 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def get_with_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_list(self, anon_client, catalogue):
+        data, queries = get_with_queries(
+            anon_client, TITLES_URL, {'fields': 'year,id,name,rating'}
+        )
+        assert [list(item) for item in data['results']] == [
+            ['id', 'name', 'rating', 'year']
+        ] * len(catalogue), (
+            'Проверьте, что поля выводятся в порядке полного ответа'
+        )
+        sql = ' '.join(queries)
+        assert 'description' not in sql
+        assert 'reviews_category' not in sql
+        assert 'reviews_title_genre' not in sql
+        _, full_queries = get_with_queries(
+            anon_client, TITLES_URL, {'limit': 100}
+        )
+        assert len(queries) == len(full_queries) - 1
+
+    def test_titles_slugs_and_expand(self, anon_client, catalogue, genres):
+        data, _ = get_with_queries(
+            anon_client, TITLES_URL, {'fields': 'genre,category'}
+        )
+        slugs = sorted(genre.slug for genre in genres)
+        assert data['results'][0] == {'genre': slugs, 'category': 'movie'}
+        data, _ = get_with_queries(anon_client, TITLES_URL, {
+            'fields': 'genre,category', 'expand': 'genre'
+        })
+        assert data['results'][0] == {
+            'genre': [
+                {'name': genre.name, 'slug': genre.slug}
+                for genre in sorted(genres, key=lambda genre: genre.name)
+            ],
+            'category': 'movie',
+        }
+
+    def test_title_retrieve(self, anon_client, catalogue):
+        title = catalogue[0]
+        data, queries = get_with_queries(
+            anon_client, f'{TITLES_URL}{title.pk}/', {'fields': 'id,name'}
+        )
+        assert data == {'id': title.pk, 'name': title.name}
+        sql = ' '.join(queries)
+        assert 'description' not in sql
+        assert 'reviews_title_genre' not in sql
+
+    def test_full_response_is_not_cached_as_sparse(
+        self, anon_client, catalogue
+    ):
+        get_with_queries(anon_client, TITLES_URL, {'fields': 'id'})
+        data, _ = get_with_queries(anon_client, TITLES_URL)
+        assert 'description' in data['results'][0]
+
+    def test_reviews_keyset(self, anon_client, catalogue):
+        url = f'{TITLES_URL}{catalogue[0].pk}/reviews/'
+        data, queries = get_with_queries(
+            anon_client, url, {'fields': 'id,score', 'cursor': '', 'limit': 2}
+        )
+        assert list(data['results'][0]) == ['id', 'score']
+        assert 'reviews_user' not in queries[-1]
+        assert data['next']
+        page, _ = get_with_queries(anon_client, data['next'])
+        assert page['results'][0]['id'] < data['results'][-1]['id']
+
+    def test_comments(self, anon_client, catalogue):
+        review = catalogue[0].reviews.order_by('pk').first()
+        data, _ = get_with_queries(
+            anon_client,
+            f'{TITLES_URL}{catalogue[0].pk}/reviews/{review.pk}/comments/',
+            {'fields': 'author'},
+        )
+        assert data['results'][0] == {
+            'author': review.comments.order_by('-pub_date', '-id')
+            .first().author.username
+        }
+
+    @pytest.mark.parametrize('params', (
+        {'fields': 'id,unknown'},
+        {'fields': ''},
+        {'fields': 'id', 'expand': 'description'},
+    ))
+    def test_invalid(self, anon_client, catalogue, params):
+        response = anon_client.get(TITLES_URL, params)
+        assert response.status_code == 400
+        assert set(response.json()) <= {'fields', 'expand'}
+
+    def test_writes_ignore_fields(self, admin_client, category):
+        response = admin_client.post(
+            f'{TITLES_URL}?fields=id',
+            {'name': 'Новое', 'year': 2000, 'category': 'movie', 'genre': []},
+            format='json',
+        )
+        assert response.status_code == 201
+        assert 'name' in response.json()
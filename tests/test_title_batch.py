@@ -0,0 +1,122 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def make_items(count, genres):
+    return [
+        {
+            'name': f'Произведение {number}',
+            'year': 2000 + number,
+            'category': 'movie',
+            'genre': [genre.slug for genre in genres],
+        }
+        for number in range(count)
+    ]
+
+
+def send(client, method, data):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(TITLES_URL, data, format='json')
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+
+    def test_create(self, admin_client, category, genres):
+        response, _ = send(admin_client, 'post', make_items(3, genres))
+        assert response.status_code == 201, response.json()
+        data = response.json()
+        assert [item['name'] for item in data] == [
+            f'Произведение {number}' for number in range(3)
+        ]
+        title = Title.objects.get(pk=data[0]['id'])
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            genre.slug for genre in genres
+        }
+        assert data[0]['genre'] == [genre.slug for genre in genres]
+        assert data[0]['category'] == category.slug
+
+    def test_queries_do_not_depend_on_size(
+        self, admin_client, category, genres
+    ):
+        send(admin_client, 'post', make_items(1, genres))
+        _, small = send(admin_client, 'post', make_items(2, genres))
+        _, large = send(admin_client, 'post', make_items(20, genres))
+        if connection.features.can_return_ids_from_bulk_insert:
+            assert small == large
+        else:
+            # SQLite не возвращает id из bulk_create: INSERT на элемент
+            assert large - small == 18
+
+    def test_errors_per_item(self, admin_client, category, genres):
+        items = make_items(3, genres)
+        items[1]['genre'] = ['missing']
+        items[2]['year'] = 'не число'
+        response, _ = send(admin_client, 'post', items)
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'genre' in errors[1]
+        assert 'year' in errors[2]
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибках пакет не записывается'
+        )
+
+    def test_partial_update(self, admin_client, catalogue, genres):
+        response, _ = send(admin_client, 'patch', [
+            {'id': catalogue[0].pk, 'name': 'Новое название'},
+            {'id': catalogue[1].pk, 'genre': [genres[2].slug]},
+        ])
+        assert response.status_code == 200, response.json()
+        catalogue[0].refresh_from_db()
+        assert catalogue[0].name == 'Новое название'
+        assert list(
+            catalogue[1].genre.values_list('slug', flat=True)
+        ) == [genres[2].slug]
+        assert response.json()[1]['genre'] == [genres[2].slug]
+
+    def test_duplicate_genres(self, admin_client, catalogue, genres):
+        items = make_items(1, genres[:1])
+        items[0]['genre'] *= 2
+        response, _ = send(admin_client, 'post', items)
+        assert response.status_code == 201, response.json()
+        assert response.json()[0]['genre'] == [genres[0].slug]
+        response, _ = send(admin_client, 'patch', [
+            {'id': catalogue[0].pk, 'genre': [genres[1].slug] * 2},
+        ])
+        assert response.status_code == 200, response.json()
+        assert response.json()[0]['genre'] == [genres[1].slug]
+        assert list(
+            catalogue[0].genre.values_list('slug', flat=True)
+        ) == [genres[1].slug]
+
+    def test_partial_update_errors(self, admin_client, catalogue):
+        response, _ = send(admin_client, 'patch', [
+            {'id': catalogue[0].pk, 'name': 'Новое название'},
+            {'id': 0, 'name': 'Нет такого'},
+            {'id': catalogue[0].pk, 'year': 1999},
+        ])
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'id' in errors[1] and 'id' in errors[2]
+        catalogue[0].refresh_from_db()
+        assert catalogue[0].name != 'Новое название'
+
+    def test_only_admin(self, user_client, category, genres):
+        response, _ = send(user_client, 'post', make_items(1, genres))
+        assert response.status_code == 403
+        response, _ = send(user_client, 'patch', [])
+        assert response.status_code == 403
+
+    def test_list_cache_invalidated(
+        self, anon_client, admin_client, category, genres
+    ):
+        assert anon_client.get(TITLES_URL).json()['count'] == 0
+        send(admin_client, 'post', make_items(2, genres))
+        assert anon_client.get(TITLES_URL).json()['count'] == 2